@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+MANIFEST_FILE = "manifest.json"
+OBJECTS_DIR = "objects"
+
+
+def file_sha256(path):
+    """
+    :param path: path of file to hash
+    :return: hex sha256 of file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """
+    Local store of downloaded files. File contents are saved once under their sha256, and a
+    manifest maps each source file ID to the hash, size, source URL and fetch time of its
+    latest download, so stored files can be verified and served without the network.
+    """
+
+    def __init__(self, store_dir):
+        """
+        :param store_dir: directory to keep stored files and manifest in
+        """
+        self.store_dir = store_dir
+        self.objects_dir = os.path.join(store_dir, OBJECTS_DIR)
+        self.manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        try:
+            with open(self.manifest_path, encoding="utf-8") as file:
+                self.manifest = json.load(file)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def object_path(self, sha256):
+        return os.path.join(self.objects_dir, sha256)
+
+    def get(self, file_id, verify=True):
+        """
+        Finds the stored copy of a file.
+
+        :param file_id: source file ID
+        :param verify: check the stored contents still match the recorded hash
+        :return: path to stored file or None if missing or corrupted
+        """
+        entry = self.manifest.get(file_id)
+        if entry is None or not os.path.exists(self.object_path(entry["sha256"])):
+            return None
+        if verify and file_sha256(self.object_path(entry["sha256"])) != entry["sha256"]:
+            print(f"Stored copy of {file_id} does not match its hash, ignoring it")
+            return None
+        return self.object_path(entry["sha256"])
+
+    def put(self, file_id, content, source_url=None):
+        """
+        Stores downloaded contents of a file and records them in the manifest.
+
+        :param file_id: source file ID
+        :param content: file contents as bytes
+        :param source_url: url file was downloaded from
+        :return: path to stored file
+        """
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self.object_path(sha256)
+
+        # identical contents are already stored, only write new ones
+        if not os.path.exists(path):
+            tmp_path = f"{path}.tmp{threading.get_ident()}"
+            with open(tmp_path, "wb") as file:
+                file.write(content)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            self.manifest[file_id] = {
+                "sha256": sha256,
+                "size": len(content),
+                "source_url": source_url,
+                "fetched_at": time.time(),
+            }
+            tmp_path = f"{self.manifest_path}.tmp{threading.get_ident()}"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self.manifest, file, indent=4)
+            os.replace(tmp_path, self.manifest_path)
+
+        return path
+
+    def export(self, file_id, dest_path):
+        """
+        Copies a stored file to a destination, skipping the copy when the destination already has the same contents.
+
+        :param file_id: source file ID
+        :param dest_path: path to copy stored file to
+        :return: True if the destination was written
+        """
+        entry = self.manifest[file_id]
+        if os.path.exists(dest_path) and os.path.getsize(dest_path) == entry["size"] and file_sha256(dest_path) == entry["sha256"]:
+            return False
+        shutil.copyfile(self.object_path(entry["sha256"]), dest_path)
+        return True
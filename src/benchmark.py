@@ -0,0 +1,290 @@
+import argparse
+import contextlib
+import glob
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from config import (BENCHMARK_FIXTURES_DIR, RAW_DATA_DIR, STATS_HTML, SEASON_TIME_RANGES, ARTICLE_WORKERS,
+                    ARTICLE_JSON, ARTICLE_CSV, STATS_CSV, GSW_DRIVE_CSV, RAKUTEN_DRIVE_CSV, UNITED_DRIVE_CSV,
+                    CHASE_DRIVE_CSV, SPONSOR_REGISTRY)
+from fetcher import Fetcher
+from fixtures import make_schedule_html, make_schedule_rows
+from fixture_server import FixtureServer, make_articles
+from load_datasets import STATS_PARSERS, get_gsw_articles_api, get_gsw_game_stats_webscrape, download_gdrive_file
+from process_data import (SPONSOR_PHRASE_PATTERN, add_sponsor_columns, clean_game_stats, clean_articles,
+                          aggregate_daily_articles, stream_article_data)
+from sponsors import SponsorMatcher
+
+def time_call(func, *args, repeat=5):
+    """
+    Times a function call, keeping the best of several runs.
+
+    :param func: function to time
+    :param args: arguments to call function with
+    :param repeat: number of runs
+    :return: tuple of best time in seconds and result of last call
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+def load_html_fixtures(fixtures_dir=BENCHMARK_FIXTURES_DIR):
+    """
+    Loads saved ESPN schedule pages to benchmark parsing with. Synthetic pages are saved
+    to the fixtures directory first if it has none, and the page captured by the stats
+    loader is included when it exists.
+
+    :param fixtures_dir: directory of saved HTML pages
+    :return: dictionary of file name to HTML
+    """
+    os.makedirs(fixtures_dir, exist_ok=True)
+    if not glob.glob(os.path.join(fixtures_dir, "*.html")):
+        for year, _, _ in SEASON_TIME_RANGES:
+            with open(os.path.join(fixtures_dir, f"espn_schedule_{year}.html"), "w", encoding="utf-8") as file:
+                file.write(make_schedule_html(year))
+
+    paths = sorted(glob.glob(os.path.join(fixtures_dir, "*.html")))
+    captured_path = os.path.join(RAW_DATA_DIR, STATS_HTML)
+    if os.path.exists(captured_path):
+        paths.append(captured_path)
+
+    fixtures = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            fixtures[os.path.basename(path)] = file.read()
+
+    return fixtures
+
+def benchmark_stats_parsers(fixtures, repeat=5):
+    """
+    Times every ESPN schedule parsing engine on each page and checks that they return the same rows.
+
+    :param fixtures: dictionary of file name to HTML
+    :param repeat: number of runs per page, best run is kept
+    :return: dictionary of parser name to total seconds over all pages
+    """
+    totals = {name: 0.0 for name in STATS_PARSERS}
+    for name, html in fixtures.items():
+        seconds, results = {}, {}
+        for parser, parse_table in STATS_PARSERS.items():
+            seconds[parser], results[parser] = time_call(parse_table, html, 2021, repeat=repeat)
+            totals[parser] += seconds[parser]
+
+        # every engine must produce exactly the same rows
+        rows = list(results.values())
+        match = all(result == rows[0] for result in rows[1:])
+        timings = ", ".join(f"{parser} {page_seconds * 1000:.1f}ms" for parser, page_seconds in seconds.items())
+        print(f"{name} ({len(html) // 1024} KB, {len(rows[0] or [])} games): {timings}, same rows: {match}")
+
+    return totals
+
+def benchmark_sponsor_matcher(n_articles=20000, registry_sizes=(3, 30, 300), repeat=3):
+    """
+    Times sponsor extraction on synthetic articles while growing the sponsor registry with made up
+    brands, two aliases each, to check the cost stays about flat as sponsors are added.
+
+    :param n_articles: number of synthetic articles
+    :param registry_sizes: numbers of made up sponsors added to SPONSOR_REGISTRY
+    :param repeat: number of runs per size, best run is kept
+    :return: dictionary of registry size to seconds
+    """
+    items = make_articles(n_articles)
+    articles_df = pd.DataFrame({"Title": [item["title"] for item in items], "Excerpt": [item["excerpt"] for item in items]})
+
+    timings = {}
+    for size in registry_sizes:
+        registry = {**SPONSOR_REGISTRY, **{f"Brand{i} Co": [f"Brand{i}", f"B{i} Group"] for i in range(size)}}
+        matcher = SponsorMatcher(registry, phrase_pattern=SPONSOR_PHRASE_PATTERN)
+        seconds, _ = time_call(lambda: add_sponsor_columns(articles_df.copy(), matcher), repeat=repeat)
+        timings[len(registry)] = seconds
+        print(f"{len(registry)} sponsors: {seconds * 1000:.1f}ms for {n_articles} articles")
+
+    return timings
+
+def benchmark_game_stats(first_year=1986, last_year=2025, n_teams=30, repeat=3):
+    """
+    Times game stats cleaning on a synthetic schedule of every team over several decades and compares
+    the memory of the typed result with the same frame held as object strings and int64.
+
+    :param first_year: first season year
+    :param last_year: last season year
+    :param n_teams: number of teams, each gets its own schedule every season
+    :param repeat: number of runs, best run is kept
+    :return: dictionary of measurements
+    """
+    raw_df = pd.DataFrame([row for team in range(n_teams) for year in range(first_year, last_year + 1)
+                           for row in make_schedule_rows(year, seed=team * 10_000 + year)])
+
+    seconds, stats_df = time_call(clean_game_stats, raw_df, repeat=repeat)
+
+    # the same data with the object strings and int64 columns the cleaning used to produce
+    untyped_df = stats_df.astype({column: object if isinstance(dtype, pd.CategoricalDtype) else "int64"
+                                  for column, dtype in stats_df.dtypes.items() if column != "Date"})
+    report = {
+        "rows": len(stats_df),
+        "seconds": seconds,
+        "rows_per_second": len(stats_df) / seconds,
+        "raw_mb": raw_df.memory_usage(deep=True).sum() / 1024 / 1024,
+        "untyped_mb": untyped_df.memory_usage(deep=True).sum() / 1024 / 1024,
+        "typed_mb": stats_df.memory_usage(deep=True).sum() / 1024 / 1024,
+    }
+    print(f"clean_game_stats: {report['rows']} games ({n_teams} teams, {first_year}-{last_year}) in {seconds:.2f}s, "
+          f"{report['rows_per_second']:.0f} rows/s, raw {report['raw_mb']:.1f} MB, object/int64 {report['untyped_mb']:.1f} MB, "
+          f"typed {report['typed_mb']:.1f} MB")
+
+    return report
+
+def peak_memory(func):
+    """
+    :param func: function to call
+    :return: tuple of seconds, peak Python memory in MB and result of call, printed output is discarded
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 1024 / 1024, result
+
+def benchmark_article_stream(sizes=(2000, 8000), page_size=50):
+    """
+    Compares peak memory of loading every article before cleaning with streaming articles into daily
+    counts, for growing feeds served by a FixtureServer, and checks both give the same daily table.
+
+    :param sizes: numbers of articles in the feed
+    :param page_size: articles per API page
+    :return: list of measurement dictionaries
+    """
+    reports = []
+    for n_articles in sizes:
+        with FixtureServer(n_articles=n_articles, page_size=page_size) as server, tempfile.TemporaryDirectory() as extract_dir:
+            full_seconds, full_mb, full_df = peak_memory(lambda: aggregate_daily_articles(*clean_articles(get_gsw_articles_api(
+                server.articles_url, ARTICLE_JSON, ARTICLE_CSV, extract_dir=extract_dir, use_cache=False))))
+            stream_seconds, stream_mb, stream_df = peak_memory(lambda: stream_article_data(server.articles_url, use_cache=False))
+
+        report = {"articles": n_articles, "full_seconds": full_seconds, "full_mb": full_mb,
+                  "stream_seconds": stream_seconds, "stream_mb": stream_mb, "same_result": full_df.equals(stream_df)}
+        reports.append(report)
+        print(f"{n_articles} articles: full load {full_mb:.1f} MB in {full_seconds:.1f}s, "
+              f"streamed {stream_mb:.1f} MB in {stream_seconds:.1f}s, same daily table: {report['same_result']}")
+
+    return reports
+
+def benchmark_loader(name, load, fetcher):
+    """
+    Runs a loader once and measures throughput, request latency and peak Python memory.
+
+    :param name: name of loader for report
+    :param load: function running the loader, returning a DataFrame or list of DataFrames
+    :param fetcher: Fetcher used by the loader, its requests are timed
+    :return: dictionary of measurements
+    """
+    # time every response from the moment the request is sent until headers arrive
+    latencies = []
+    fetcher.session.hooks["response"].append(lambda response, *args, **kwargs: latencies.append(response.elapsed.total_seconds()))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    results = result if isinstance(result, list) else [result]
+    rows = sum(len(df) for df in results if df is not None)
+    latencies = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    report = {
+        "loader": name,
+        "requests": fetcher.stats["attempts"],
+        "retries": fetcher.stats["retries"],
+        "rows": rows,
+        "seconds": seconds,
+        "requests_per_second": fetcher.stats["attempts"] / seconds,
+        "rows_per_second": rows / seconds,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "peak_mb": peak / 1024 / 1024,
+    }
+    print(f"{name}: {report['rows']} rows in {report['seconds']:.2f}s, {report['requests']} requests "
+          f"({report['retries']} retries), {report['requests_per_second']:.1f} req/s, {report['rows_per_second']:.0f} rows/s, "
+          f"p50 {report['p50_ms']:.1f}ms, p99 {report['p99_ms']:.1f}ms, peak memory {report['peak_mb']:.1f} MB")
+
+    return report
+
+def benchmark_ingestion(server, workers=ARTICLE_WORKERS):
+    """
+    Runs the articles, ESPN stats and Google Drive loaders against a FixtureServer, without
+    response caches or stored downloads so every request goes to the server.
+
+    :param server: running FixtureServer
+    :param workers: pages requested at once by the articles loader
+    :return: list of measurement dictionaries
+    """
+    reports = []
+    with tempfile.TemporaryDirectory() as extract_dir:
+        # generous retry budget so configured error rates do not open the circuit
+        fetcher_options = {"backoff_base": 0.01, "retry_budget": 10_000, "failure_threshold": 1_000}
+
+        fetcher = Fetcher("GSW News", pool_size=workers, **fetcher_options)
+        reports.append(benchmark_loader("get_gsw_articles_api", lambda: get_gsw_articles_api(
+            server.articles_url, ARTICLE_JSON, ARTICLE_CSV, extract_dir=extract_dir,
+            workers=workers, fetcher=fetcher), fetcher))
+
+        fetcher = Fetcher("ESPN stats", **fetcher_options)
+        reports.append(benchmark_loader("get_gsw_game_stats_webscrape", lambda: get_gsw_game_stats_webscrape(
+            server.stats_url, STATS_HTML, STATS_CSV, extract_dir=extract_dir, fetcher=fetcher), fetcher))
+
+        fetcher = Fetcher("Google Drive", **fetcher_options)
+        drive_urls = [GSW_DRIVE_CSV, RAKUTEN_DRIVE_CSV, UNITED_DRIVE_CSV, CHASE_DRIVE_CSV]
+        reports.append(benchmark_loader("download_gdrive_file", lambda: [download_gdrive_file(
+            drive_url, f"trends_{index}.csv", extract_dir=extract_dir, fetcher=fetcher, refresh=True,
+            download_url=server.gdrive_url) for index, drive_url in enumerate(drive_urls)], fetcher))
+
+    return reports
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark data ingestion against local fixtures")
+    arg_parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every fixture server response")
+    arg_parser.add_argument("--jitter", type=float, default=0.02, help="max random seconds added on top of latency")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    arg_parser.add_argument("--articles", type=int, default=1000, help="number of articles served by the news API")
+    arg_parser.add_argument("--workers", type=int, default=ARTICLE_WORKERS, help="pages requested at once by the articles loader")
+    args = arg_parser.parse_args()
+
+    print("Running ingestion benchmarks:\n")
+
+    # --- Loaders Against Local Fixture Server ---
+    with FixtureServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, n_articles=args.articles) as server:
+        benchmark_ingestion(server, workers=args.workers)
+    print()
+
+    # --- Streaming Article Ingestion ---
+    benchmark_article_stream()
+    print()
+
+    # --- Game Stats Cleaning ---
+    benchmark_game_stats()
+    print()
+
+    # --- Sponsor Extraction ---
+    benchmark_sponsor_matcher()
+    print()
+
+    # --- ESPN Schedule Parsing ---
+    fixtures = load_html_fixtures()
+    totals = benchmark_stats_parsers(fixtures)
+    print(f"\nESPN parsing over {len(fixtures)} pages: " +
+          ", ".join(f"{parser} {seconds * 1000:.1f}ms" for parser, seconds in totals.items()) +
+          f", lxml speedup {totals['bs4'] / totals['lxml']:.1f}x")
@@ -1,8 +1,35 @@
+import os
+
 # project configuration
 DATA_DIR = "data"
 CLEANED_DATA_DIR = "data/cleaned"
 RAW_DATA_DIR = "data/raw"
 
+BENCHMARK_FIXTURES_DIR = "data/fixtures"
+
+# serve downloads from local stores only and never use the network, e.g. GSW_OFFLINE=1 on machines without outbound access,
+# main.py then rebuilds articles and game stats from the raw pages captured by earlier runs
+OFFLINE = os.environ.get("GSW_OFFLINE", "0") == "1"
+
+# cleaned datasets are stored as typed columnar files, "feather" (uncompressed Arrow IPC, memory-mappable) or "parquet"
+STORAGE_FORMAT = "feather"
+# also write a CSV copy of every cleaned dataset
+EXPORT_CSV = False
+
+# fingerprint and outputs of every finished main.py stage, stages with unchanged fingerprints are skipped
+PIPELINE_CACHE_JSON = "data/pipeline_cache.json"
+# max main.py stages running at once, loaders and plot stages run in threads and the combine stage in a process
+PIPELINE_WORKERS = 4
+# output printed by each stage is kept in its own log file
+PIPELINE_LOG_DIR = "data/logs"
+
+# processes rendering the figures of each plot function at once
+PLOT_WORKERS = 4
+# max render processes of all plot functions running at once, e.g. plot stages running in parallel, one per CPU
+PLOT_MAX_PROCESSES = os.cpu_count() or 1
+# data and parameter hash of every rendered plot file, plots with unchanged hashes are not drawn again
+PLOT_MANIFEST_JSON = "data/plot_manifest.json"
+
 RESULTS_DIR = "results"
 ARTICLES_RESULTS_DIR = "results/articles"
 STATS_RESULTS_DIR = "results/stats"
@@ -18,15 +45,46 @@ SEASON_TIME_RANGES = [(2021,'2020-12-22','2021-05-16'),(2022,'2021-10-19','2022-
 ARTICLES_URL = 'https://www.nba.com/warriors/api/content/category/news?page={}'
 STATS_URL = "https://www.espn.com/nba/team/schedule/_/name/gs/season/{}"
 
+# number of GSW News API pages requested at once, incremental refreshes usually stop on page 1
+ARTICLE_WORKERS = 8
+INCREMENTAL_ARTICLE_WORKERS = 2
+# streamed articles are cleaned in batches of this many, and duplicates are checked against this many recent permalinks
+ARTICLE_STREAM_BATCH_SIZE = 500
+ARTICLE_STREAM_DEDUPE_WINDOW = 2000
+
+# retry and circuit breaker settings shared by all loaders
+FETCH_MAX_RETRIES = 4
+FETCH_BACKOFF_BASE = 0.5
+FETCH_BACKOFF_MAX = 30
+FETCH_RETRY_BUDGET = 20
+FETCH_FAILURE_THRESHOLD = 5
+
+# on-disk response cache kept inside the raw data directory
+HTTP_CACHE_DIR = "http_cache"
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024
+# seconds a cached page is served before revalidating, pages of completed seasons never expire
+# article pages shift by one article whenever one is posted, so they are always revalidated
+ARTICLES_CACHE_TTL = 0
+STATS_CACHE_TTL = 6 * 60 * 60
+
 # --- GSW Articles Data ---
 ARTICLE_JSON = 'GoldenStateWarriors_Articles.json'
 ARTICLE_CSV = 'GoldenStateWarriors_Articles.csv'
+ARTICLE_WATERMARK_JSON = 'GoldenStateWarriors_Articles_Watermark.json'
+# every raw API page, one JSON line per page
+ARTICLE_CAPTURE = 'GoldenStateWarriors_Articles.ndjson.gz'
 CLEANED_ARTICLE_CSV = "GoldenStateWarriors_Articles_Cleaned.csv"
+# one row per sponsor phrase found in an article
+SPONSOR_MENTIONS_CSV = "GoldenStateWarriors_Sponsor_Mentions.csv"
 ALL_ARTICLES_PLOT = '2021-2025_GSW_Article_Plot.png'
 SEASON_ARTICLES_PLOT = ['2021_GSW_Article_Plot.png','2022_GSW_Article_Plot.png','2023_GSW_Article_Plot.png','2024_GSW_Article_Plot.png','2025_GSW_Article_Plot.png']
 
 # --- GSW Game Stats Data ---
 STATS_HTML = "GoldenStateWarriors_Stats.html"
+# every raw schedule page, one file per season
+STATS_CAPTURE = "GoldenStateWarriors_Stats_{}.html.gz"
+# engine to parse ESPN schedule pages, "lxml" (table only) or "bs4" (full page tree)
+STATS_PARSER = "lxml"
 STATS_CSV = "GoldenStateWarriors_Stats.csv"
 CLEANED_STATS_CSV = "GoldenStateWarriors_Stats_Cleaned.csv"
 ALL_STATS_PLOT = '2021-2025_GSW_Stats_Plot.png'
@@ -37,17 +95,40 @@ TEAM_AND_SPONSORS = ['Golden State Warriors','Rakuten','United Airlines','JPMorg
 TEAM = 'Golden State Warriors'
 SPONSORS = ['Rakuten','United Airlines','Chase']
 FORMATTED_SPONSORS = ['Rakuten','UnitedAirlines','Chase']
+# sponsors counted in articles, canonical name to aliases matched case-insensitively, every entry gets a <Name>_Count column
+SPONSOR_REGISTRY = {
+    'Rakuten': ['Rakuten'],
+    'United Airlines': ['United Airlines'],
+    'Chase': ['Chase', 'JPMorgan Chase', 'JP Morgan Chase', 'Chase Bank'],
+}
+# largest lead and lag in days built for every trend and article count series by lags.LagWindow
+LAG_WINDOW = 7
 TREND_START_DATE = '2020-12-01'
 TREND_END_DATE = '2025-4-30'
 
+# month windows of raw Google Trends responses are cached inside the raw data directory
+TRENDS_CACHE_DIR = "trends_cache"
+TRENDS_WORKERS = 4
+TRENDS_REQUESTS_PER_MINUTE = 12
+TRENDS_BURST = 3
+TRENDS_MAX_RETRIES = 3
+# main.py retrieves every keyword from the Google Trends API in one batch instead of reading the Google Drive files
+TRENDS_RETRIEVE_API = False
+
 GSW_DRIVE_CSV='https://drive.google.com/file/d/1drZDsBeIfyDkvmKnmJgcTiieLIWqLpGo/view?usp=drive_link'
+GDRIVE_DOWNLOAD_URL = "https://drive.google.com/uc?export=download&id={}"
+# downloaded Google Drive files are kept inside the raw data directory, keyed by file ID and content hash
+ARTIFACT_STORE_DIR = "artifacts"
+
 CHASE_DRIVE_CSV = 'https://drive.google.com/file/d/1MY3d2EDP2q9TmZtGrEg8M7BnPaO_CP4Q/view?usp=drive_link'
 RAKUTEN_DRIVE_CSV = 'https://drive.google.com/file/d/1RFxTd88-adlohZQ6bH0gWoJdnlQ0e_lT/view?usp=drive_link'
 UNITED_DRIVE_CSV = 'https://drive.google.com/file/d/1isX0J90Sx-oBwh8A-1S3EPKUBc6Mt0bk/view?usp=drive_link'
 
 ALL_TRENDS_CSV = 'All_Trends_Cleaned.csv'
-ALL_SEASONS_DATA_CSV = '2021-2025_GSW_Data.csv'
-SEASON_DATA_CSV = ['2021_GSW_Data.csv','2022_GSW_Data.csv','2023_GSW_Data.csv','2024_GSW_Data.csv','2025_GSW_Data.csv']
+# combined data of every day in one directory partitioned by season, days between seasons have no season
+ALL_DATA_DATASET = '2021-2025_GSW_Data'
+# correlations of the combined data over all days and each season, one row per dataset, method and pair of columns, saved as Parquet
+CORRELATIONS_TABLE = 'GSW_Correlations.parquet'
 
 GSW_TREND_CSV ='GoldenStateWarriors_Trends.csv'
 RAKUTEN_TREND_CSV = 'Rakuten_Trends.csv'
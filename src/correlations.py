@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+from config import SEASON_TIME_RANGES, CORRELATIONS_TABLE
+from storage import write_table, read_table
+
+METHODS = ("pearson", "spearman")
+ALL_DATA = "All Data"
+
+
+def season_label(year):
+    """
+    :param year: season year from SEASON_TIME_RANGES
+    :return: dataset label of season, as used for the datasets of run_regression, e.g. '2023 Season'
+    """
+    return f"{year} Season"
+
+def dataset_masks(df):
+    """
+    :param df: DataFrame with a Date column
+    :return: list of dataset labels and boolean numpy array of rows by dataset, all rows first and then each season
+    """
+    labels = [ALL_DATA] + [season_label(year) for year, _, _ in SEASON_TIME_RANGES]
+    dates = df["Date"].to_numpy(dtype="datetime64[ns]")
+    masks = [np.ones(len(df), dtype=bool)]
+    for _, start_date, end_date in SEASON_TIME_RANGES:
+        masks.append((dates >= np.datetime64(pd.to_datetime(start_date))) & (dates <= np.datetime64(pd.to_datetime(end_date))))
+    return labels, np.stack(masks, axis=1)
+
+def masked_pearson(x, y, mask):
+    """
+    Pearson correlation along the first axis of arrays broadcast together, each over the rows where
+    mask is True, like DataFrame.corr drops missing values pair by pair.
+
+    :param x: numpy array, rows first
+    :param y: numpy array broadcastable with x
+    :param mask: boolean numpy array broadcastable with x of rows each correlation uses
+    :return: numpy arrays of correlations and of rows used, NaN where fewer than two rows or a constant series
+    """
+    n = mask.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_mean = np.where(mask, x, 0.0).sum(axis=0) / n
+        y_mean = np.where(mask, y, 0.0).sum(axis=0) / n
+        x = np.where(mask, x - x_mean, 0.0)
+        y = np.where(mask, y - y_mean, 0.0)
+        r = (x * y).sum(axis=0) / np.sqrt((x * x).sum(axis=0) * (y * y).sum(axis=0))
+    return np.clip(r, -1, 1), n
+
+def complete_correlations(values, method="pearson"):
+    """
+    :param values: numpy array of rows by columns without missing values
+    :param method: "pearson", or "spearman" to correlate the ranks of each column
+    :return: numpy array of correlations of every pair of columns, NaN for constant columns
+    """
+    if method == "spearman":
+        values = pd.DataFrame(values).rank(axis=0).to_numpy()
+    elif method != "pearson":
+        raise ValueError(f"Unknown correlation method {method}, use 'pearson' or 'spearman'")
+    values = values - values.mean(axis=0)
+    norms = np.sqrt((values * values).sum(axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.clip(values.T @ values / np.outer(norms, norms), -1, 1)
+
+def correlation_table(df, columns, methods=METHODS):
+    """
+    Correlates every pair of columns over all rows and within each season of SEASON_TIME_RANGES at once.
+    Each pair only uses the rows where both columns are present, so the results equal DataFrame.corr
+    of the same rows, and the number of rows used is kept for every pair. Columns missing on the same
+    days, e.g. every game stat, share their complete rows, so all pairs of two such groups of columns
+    are correlated with one matrix product instead of one pass over the rows per pair.
+
+    :param df: DataFrame with a Date column, e.g. from load_all_data
+    :param columns: list of columns to correlate
+    :param methods: "pearson" and/or "spearman"
+    :return: tidy DataFrame with one row per dataset, method and ordered pair of columns dataset, method, x, y, r and n
+    """
+    columns = list(dict.fromkeys(columns))
+    labels, datasets = dataset_masks(df)
+    values = df[columns].to_numpy(dtype="float64", na_value=np.nan)
+    present = ~np.isnan(values)
+
+    # rows of each dataset where both columns of a pair are present, dataset by column by column
+    weighted = datasets.T[:, :, None] * present[None, :, :]
+    n = weighted.transpose(0, 2, 1).astype("int64") @ present.astype("int64")
+
+    # columns with the same missing values, and each column's group
+    patterns, pattern_of = np.unique(present.T, axis=0, return_inverse=True)
+    pattern_of = pattern_of.ravel()
+
+    tables = []
+    for method in methods:
+        r = np.full(n.shape, np.nan)
+        for dataset in range(len(labels)):
+            for a in range(len(patterns)):
+                for b in range(a, len(patterns)):
+                    rows = patterns[a] & patterns[b] & datasets[:, dataset]
+                    if rows.sum() < 2:
+                        continue
+                    # pairs of a column of one group and a column of the other
+                    columns_a, columns_b = np.flatnonzero(pattern_of == a), np.flatnonzero(pattern_of == b)
+                    group = columns_a if a == b else np.concatenate([columns_a, columns_b])
+                    corr = complete_correlations(values[np.ix_(rows, group)], method)
+                    r[dataset][np.ix_(columns_a, columns_b)] = corr[:len(columns_a), -len(columns_b):]
+                    r[dataset][np.ix_(columns_b, columns_a)] = corr[-len(columns_b):, :len(columns_a)]
+
+        # one tidy row per cell ordered by dataset
+        dataset, x, y = np.meshgrid(np.arange(len(labels)), np.arange(len(columns)), np.arange(len(columns)), indexing="ij")
+        tables.append(pd.DataFrame({"dataset": np.asarray(labels)[dataset.ravel()], "method": method,
+                                    "x": np.asarray(columns)[x.ravel()], "y": np.asarray(columns)[y.ravel()],
+                                    "r": r.ravel(), "n": n.ravel()}))
+
+    return pd.concat(tables, ignore_index=True)
+
+def correlation_matrix(table, columns, dataset=ALL_DATA, method="pearson"):
+    """
+    :param table: tidy DataFrame from correlation_table or load_correlations
+    :param columns: list of columns in the table
+    :param dataset: dataset label, e.g. 'All Data' or '2023 Season'
+    :param method: "pearson" or "spearman"
+    :return: DataFrame of correlations of columns, like DataFrame.corr of those columns
+    """
+    rows = table[(table["dataset"] == dataset) & (table["method"] == method) & table["x"].isin(columns) & table["y"].isin(columns)]
+    matrix = rows.pivot(index="x", columns="y", values="r").reindex(index=columns, columns=columns)
+    return matrix.rename_axis(index=None, columns=None)
+
+def build_correlations(df, columns, name=CORRELATIONS_TABLE):
+    """
+    Computes the correlation table of the combined data and saves it as Parquet for the notebook.
+
+    :param df: DataFrame with a Date column, e.g. from load_all_data
+    :param columns: list of columns to correlate
+    :param name: correlations file name
+    :return: tidy correlations DataFrame or None
+    """
+    try:
+        return write_table(correlation_table(df, columns), name, {"n": "int64", "r": "float64"}, storage_format="parquet")
+    # return exception if error occurs
+    except Exception as e:
+        print(f"Error saving correlations: {e}")
+        return None
+
+def load_correlations(name=CORRELATIONS_TABLE, **kwargs):
+    """
+    :param name: correlations file name
+    :param data_dir: directory of correlations file
+    :return: tidy correlations DataFrame saved by build_correlations
+    """
+    return read_table(name, storage_format="parquet", **kwargs)
@@ -0,0 +1,227 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (FETCH_MAX_RETRIES, FETCH_BACKOFF_BASE, FETCH_BACKOFF_MAX,
+                    FETCH_RETRY_BUDGET, FETCH_FAILURE_THRESHOLD)
+
+# status codes worth retrying, anything else is treated as a permanent failure
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# errors without a response worth retrying, others such as an invalid url or too many redirects fail the same way again
+RETRY_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a source has failed too many times in a row and is no longer requested."""
+
+
+def create_session(pool_size=10):
+    """
+    Creates a requests session with a connection pool sized for concurrent requests,
+    so every request reuses an open TCP/TLS connection instead of reconnecting.
+
+    :param pool_size: max number of pooled connections kept open to a host
+    :return: requests Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+def retry_after_seconds(response):
+    """
+    Reads the Retry-After header of a response as a number of seconds.
+
+    :param response: requests Response
+    :return: seconds to wait or None if header is missing or unreadable
+    """
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    # header is either a number of seconds or an HTTP date
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Fetcher:
+    """
+    Sends GET requests for one data source with exponential backoff and jitter,
+    a retry budget shared by every request of the source, Retry-After support,
+    and a circuit breaker that stops requesting the source after repeated failures.
+    When given a ResponseCache, fresh entries are served from disk and stale ones are
+    revalidated with conditional requests. Attempts, retries, cache hits and time spent
+    waiting are counted in `stats`.
+    """
+
+    def __init__(self, source, **kwargs):
+        """
+        :param source: name of the data source, used in log messages
+        :param session: requests session to reuse, a pooled session is created if not given
+        :param pool_size: connection pool size of the created session
+        :param headers: headers sent with every request
+        :param timeout: request timeout in seconds
+        :param max_retries: max retries for a single request
+        :param backoff_base: first backoff delay in seconds, doubled on every retry
+        :param backoff_max: max delay in seconds between retries
+        :param retry_budget: max retries across all requests of the source
+        :param failure_threshold: failed requests in a row before the circuit opens
+        :param cache: ResponseCache to serve and store responses with
+        :param ttl: seconds a cached response is served without revalidating, None never expires
+        """
+        self.source = source
+        self.session = kwargs.get("session") or create_session(kwargs.get("pool_size", 10))
+        self.headers = kwargs.get("headers", {})
+        self.timeout = kwargs.get("timeout", 10)
+        self.max_retries = kwargs.get("max_retries", FETCH_MAX_RETRIES)
+        self.backoff_base = kwargs.get("backoff_base", FETCH_BACKOFF_BASE)
+        self.backoff_max = kwargs.get("backoff_max", FETCH_BACKOFF_MAX)
+        self.retry_budget = kwargs.get("retry_budget", FETCH_RETRY_BUDGET)
+        self.failure_threshold = kwargs.get("failure_threshold", FETCH_FAILURE_THRESHOLD)
+        self.cache = kwargs.get("cache")
+        self.ttl = kwargs.get("ttl", 0)
+
+        self.stats = {"attempts": 0, "retries": 0, "failures": 0, "wait_seconds": 0.0, "cache_hits": 0, "not_modified": 0}
+        self.consecutive_failures = 0
+        self.circuit_open = False
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Closes the underlying session."""
+        self.session.close()
+
+    def backoff(self, retry, response=None):
+        """
+        Finds how long to wait before a retry, honoring Retry-After when the server sends it.
+
+        :param retry: number of the retry, starting at 0
+        :param response: failed response, if one was received
+        :return: seconds to wait
+        """
+        retry_after = retry_after_seconds(response)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # full jitter keeps concurrent requests from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retry))
+
+    def take_retry(self):
+        """
+        Takes one retry from the source's retry budget.
+
+        :return: True if a retry was available
+        """
+        with self._lock:
+            if self.stats["retries"] >= self.retry_budget:
+                return False
+            self.stats["retries"] += 1
+            return True
+
+    def record_result(self, success):
+        """
+        Updates the circuit breaker after a request finishes.
+
+        :param success: whether the request succeeded
+        """
+        with self._lock:
+            if success:
+                self.consecutive_failures = 0
+                return
+            self.stats["failures"] += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold and not self.circuit_open:
+                self.circuit_open = True
+                print(f"{self.source}: {self.consecutive_failures} requests failed in a row, no longer requesting source")
+
+    def get(self, url, immutable=False, **kwargs):
+        """
+        Sends a GET request, retrying connection errors, timeouts, 429 and 5xx responses.
+        Fresh cached responses are returned without a request.
+
+        :param url: url to request
+        :param immutable: cache the response forever, e.g. pages of completed seasons
+        :param kwargs: extra arguments passed to requests, e.g. headers or params
+        :return: requests Response with a successful status code
+        :raises CircuitOpenError: if the source's circuit breaker is open
+        :raises requests.RequestException: if the request failed and could not be retried, e.g. an invalid url
+        """
+        headers = {**self.headers, **kwargs.pop("headers", {})}
+        kwargs.setdefault("timeout", self.timeout)
+        retry = 0
+
+        # serve fresh responses from cache, otherwise ask server if cached response changed
+        entry = self.cache.lookup(url) if self.cache is not None else None
+        if entry is not None:
+            if self.cache.is_fresh(entry, self.ttl):
+                with self._lock:
+                    self.stats["cache_hits"] += 1
+                return self.cache.response(url, entry)
+            headers = {**self.cache.conditional_headers(entry), **headers}
+
+        while True:
+            if self.circuit_open:
+                raise CircuitOpenError(f"{self.source} circuit is open, skipping {url}")
+
+            with self._lock:
+                self.stats["attempts"] += 1
+            response = None
+            try:
+                response = self.session.get(url, headers=headers, **kwargs)
+                if response.status_code == 304 and entry is not None:
+                    self.record_result(True)
+                    with self._lock:
+                        self.stats["not_modified"] += 1
+                    return self.cache.revalidated(url, entry, immutable)
+                response.raise_for_status()
+                self.record_result(True)
+                if self.cache is not None:
+                    self.cache.store(url, response, immutable)
+                return response
+            except requests.RequestException as e:
+                # request could not be sent as given, e.g. invalid url, so it is not a failure of the source
+                if not isinstance(e, RETRY_EXCEPTIONS + (requests.HTTPError,)):
+                    raise
+                status = e.response.status_code if e.response is not None else None
+                retryable = not isinstance(e, requests.HTTPError) or status in RETRY_STATUS_CODES
+                # give up if error is permanent or retries are used up
+                if not retryable or retry >= self.max_retries or not self.take_retry():
+                    self.record_result(False)
+                    raise
+
+                delay = self.backoff(retry, response)
+                print(f"{self.source}: retrying {url} in {delay:.1f}s after error: {e}")
+                with self._lock:
+                    self.stats["wait_seconds"] += delay
+                time.sleep(delay)
+                retry += 1
+
+    def flush(self):
+        """Saves the recently used order of cached responses served since the cache was last saved."""
+        if self.cache is not None:
+            self.cache.flush()
+
+    def summary(self):
+        """
+        Formats the request counters for printing.
+
+        :return: summary string
+        """
+        return (f"{self.source}: {self.stats['attempts']} attempts, {self.stats['retries']} retries, "
+                f"{self.stats['failures']} failures, {self.stats['cache_hits']} cache hits, "
+                f"{self.stats['not_modified']} not modified, {self.stats['wait_seconds']:.1f}s waiting")
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import pandas as pd
+
+from config import START_DATE, END_DATE, TREND_START_DATE, TREND_END_DATE, SPONSORS
+from fixtures import make_schedule_html
+
+# paths served by the fixture server, matching the real sources
+ARTICLES_PATH = "/warriors/api/content/category/news"
+STATS_PATH = "/nba/team/schedule/_/name/gs/season/"
+GDRIVE_PATH = "/uc"
+
+SPONSOR_PHRASES = ["presented by", "powered by", "in partnership with"]
+OTHER_SPONSORS = ["Kaiser Permanente", "Verizon", "Oracle", "Google", "Accenture", "Pepsi"]
+
+
+def make_articles(n_articles, seed=0):
+    """
+    Creates synthetic GSW News API items spread evenly from shortly before START_DATE to END_DATE,
+    newest first, with some titles and excerpts mentioning sponsors.
+
+    :param n_articles: number of articles
+    :param seed: random seed
+    :return: list of item dictionaries
+    """
+    rng = random.Random(seed)
+    newest = pd.Timestamp(END_DATE) + pd.Timedelta(hours=20)
+    span = (pd.Timestamp(END_DATE) - pd.Timestamp(START_DATE) + pd.Timedelta(days=30)) / max(n_articles, 1)
+
+    items = []
+    for index in range(n_articles):
+        sponsor = rng.choice(SPONSORS + OTHER_SPONSORS)
+        mention = f" {rng.choice(SPONSOR_PHRASES)} {sponsor}" if rng.random() < 0.3 else ""
+        items.append({
+            "title": f"Warriors Story {index}{mention}",
+            "date": (newest - span * index).strftime("%Y-%m-%dT%H:%M:%S-07:00"),
+            "excerpt": f"Excerpt for story {index}, the Warriors played at Chase Center." if rng.random() < 0.5
+                       else f"Excerpt for story {index}{mention}.",
+            "permalink": f"https://www.nba.com/warriors/news/story-{index}",
+            "authors": [{"name": rng.choice(["Warriors.com", "Staff"])}],
+        })
+
+    return items
+
+def make_trends_csv(file_id, seed=0):
+    """
+    Creates a synthetic trends CSV with the columns of pytrends' daily data for TREND_START_DATE to TREND_END_DATE.
+
+    :param file_id: Drive file ID, used as the keyword name
+    :param seed: random seed
+    :return: CSV contents as bytes
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(TREND_START_DATE, TREND_END_DATE, freq="D")
+    unscaled = rng.integers(0, 101, len(dates))
+    monthly = np.repeat(rng.integers(20, 101, len(dates) // 28 + 1), 28)[:len(dates)]
+    trend_df = pd.DataFrame({
+        f"{file_id}_unscaled": unscaled,
+        f"{file_id}_monthly": monthly,
+        "isPartial": False,
+        "scale": monthly / 100,
+        file_id: unscaled * monthly / 100,
+    })
+    return trend_df.to_csv(index=False).encode("utf-8")
+
+
+class FixtureServer:
+    """
+    Local HTTP server standing in for the GSW News API (paginated with ?page=N), ESPN schedule pages
+    and the Google Drive CSV export, with configurable latency, error rate and data volume.
+    Runs in a background thread; use as a context manager.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        :param port: port to listen on, 0 picks a free port
+        :param latency: seconds added to every response
+        :param jitter: max random seconds added on top of latency
+        :param error_rate: fraction of requests answered with 503
+        :param etags: send ETag headers and answer requests with a matching If-None-Match with 304 Not Modified
+        :param n_articles: number of articles served by the news API
+        :param page_size: articles per API page
+        :param games_per_season: games in each schedule table
+        :param filler_kb: size of non-table content on each schedule page
+        :param seed: random seed for generated data and errors
+        """
+        self.latency = kwargs.get("latency", 0.0)
+        self.jitter = kwargs.get("jitter", 0.0)
+        self.error_rate = kwargs.get("error_rate", 0.0)
+        self.etags = kwargs.get("etags", False)
+        self.page_size = kwargs.get("page_size", 10)
+        self.games_per_season = kwargs.get("games_per_season", 82)
+        self.filler_kb = kwargs.get("filler_kb", 300)
+        self.seed = kwargs.get("seed", 0)
+        self.articles = make_articles(kwargs.get("n_articles", 1000), self.seed)
+        self.requests = 0
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._pages = {}
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", kwargs.get("port", 0)), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    @property
+    def articles_url(self):
+        """url template for get_gsw_articles_api"""
+        return f"{self.base_url}{ARTICLES_PATH}?page={{}}"
+
+    @property
+    def stats_url(self):
+        """url template for get_gsw_game_stats_webscrape"""
+        return f"{self.base_url}{STATS_PATH}{{}}"
+
+    @property
+    def gdrive_url(self):
+        """download url template for download_gdrive_file"""
+        return f"{self.base_url}{GDRIVE_PATH}?export=download&id={{}}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def respond(self, path, query):
+        """
+        Builds the response for a request.
+
+        :param path: request path
+        :param query: parsed query string
+        :return: tuple of status code, content type and body bytes
+        """
+        if path == ARTICLES_PATH:
+            page = int(query.get("page", ["1"])[0])
+            items = self.articles[(page - 1) * self.page_size:page * self.page_size]
+            return 200, "application/json", json.dumps({"items": items, "page": page}).encode("utf-8")
+        if path.startswith(STATS_PATH):
+            year = int(path[len(STATS_PATH):].strip("/"))
+            # schedule pages are generated once per season, like static pages
+            if year not in self._pages:
+                self._pages[year] = make_schedule_html(year, self.games_per_season, self.filler_kb).encode("utf-8")
+            return 200, "text/html; charset=utf-8", self._pages[year]
+        if path == GDRIVE_PATH and "id" in query:
+            return 200, "text/csv", make_trends_csv(query["id"][0], self.seed)
+        return 404, "text/plain", b"not found"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    failed = server._rng.random() < server.error_rate
+                    delay = server.latency + server._rng.random() * server.jitter
+                if delay:
+                    time.sleep(delay)
+
+                if failed:
+                    status, content_type, body = 503, "text/plain", b"service unavailable"
+                else:
+                    url = urlparse(self.path)
+                    status, content_type, body = server.respond(url.path, parse_qs(url.query))
+
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"' if server.etags and status == 200 else None
+                if etag is not None and self.headers.get("If-None-Match") == etag:
+                    status, body = 304, b""
+
+                self.send_response(status)
+                if failed:
+                    self.send_header("Retry-After", "0")
+                if etag is not None:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
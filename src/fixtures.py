@@ -0,0 +1,108 @@
+import random
+from datetime import date, timedelta
+
+# synthetic data that mimics the ESPN and NBA.com sources, used for benchmarks and offline runs
+OPPONENTS = ['Atlanta', 'Boston', 'Brooklyn', 'Charlotte', 'Chicago', 'Cleveland', 'Dallas', 'Denver',
+             'Detroit', 'Houston', 'Indiana', 'LA', 'Los Angeles', 'Memphis', 'Miami', 'Milwaukee',
+             'Minnesota', 'New Orleans', 'New York', 'Oklahoma City', 'Orlando', 'Philadelphia',
+             'Phoenix', 'Portland', 'Sacramento', 'San Antonio', 'Toronto', 'Utah', 'Washington']
+PLAYERS = ['Curry', 'Thompson', 'Green', 'Wiggins', 'Poole', 'Looney', 'Kuminga', 'Podziemski']
+
+
+def make_schedule_games(year, n_games=82, seed=None):
+    """
+    Creates a synthetic regular season schedule with results and player highs.
+
+    :param year: season year, the season starts in October of the year before
+    :param n_games: number of games in the season
+    :param seed: random seed, defaults to the year so pages are reproducible
+    :return: list of game dictionaries
+    """
+    rng = random.Random(year if seed is None else seed)
+    game_date = date(year - 1, 10, 20)
+    wins = losses = 0
+    games = []
+
+    for _ in range(n_games):
+        win = rng.random() < 0.55
+        wins, losses = wins + win, losses + (not win)
+        winner_score = rng.randint(95, 140)
+        games.append({
+            "date": game_date,
+            "home": rng.random() < 0.5,
+            "opponent": rng.choice(OPPONENTS),
+            "win": win,
+            "score": f"{winner_score}-{winner_score - rng.randint(1, 30)}",
+            "overtime": rng.choice(["", "", "", "", "", "", " OT", " 2OT"]),
+            "record": f"{wins}-{losses}",
+            "highs": [(rng.choice(PLAYERS), rng.randint(lo, hi)) for lo, hi in ((15, 50), (5, 20), (4, 15))],
+        })
+        game_date += timedelta(days=rng.randint(1, 3))
+
+    return games
+
+def make_schedule_rows(year, n_games=82, seed=None):
+    """
+    Creates a synthetic regular season schedule as raw rows, the same text the stats scraper
+    extracts from each ESPN table row.
+
+    :param year: season year
+    :param n_games: number of games in the season
+    :param seed: random seed, defaults to the year so rows are reproducible
+    :return: list of game stats dictionaries
+    """
+    return [{
+        "Season": year,
+        "Date": f'{game["date"].strftime("%a, %b")} {game["date"].day}',
+        "Opponent": f'{"vs" if game["home"] else "@"} {game["opponent"]}',
+        "Result": f'{"W" if game["win"] else "L"} {game["score"]}{game["overtime"]}',
+        "Record": game["record"],
+        "Hi Points": " ".join(map(str, game["highs"][0])),
+        "Hi Rebounds": " ".join(map(str, game["highs"][1])),
+        "Hi Assists": " ".join(map(str, game["highs"][2])),
+    } for game in make_schedule_games(year, n_games, seed)]
+
+def make_schedule_html(year, n_games=82, filler_kb=300, seed=None):
+    """
+    Creates an ESPN-like team schedule page: one `table.Table` of games surrounded by
+    navigation, scripts and other page content that a scraper has to skip.
+
+    :param year: season year
+    :param n_games: number of games in the schedule table
+    :param filler_kb: approximate size of the non-table page content in kilobytes
+    :param seed: random seed, defaults to the year so pages are reproducible
+    :return: HTML string
+    """
+    cell = '<td class="Table__TD">{}</td>'
+    row = '<tr class="Table__TR Table__TR--sm Table__even" data-idx="{}">{}</tr>'
+
+    rows = [row.format(0, '<td class="Table__TD" colspan="7">Regular Season</td>'),
+            row.format(1, "".join(cell.format(f'<span>{name}</span>') for name in
+                                  ("DATE", "OPPONENT", "RESULT", "W-L", "Hi Points", "Hi Rebounds", "Hi Assists")))]
+    for index, game in enumerate(make_schedule_games(year, n_games, seed), start=2):
+        result_class = "clr-positive" if game["win"] else "clr-negative"
+        cells = [
+            f'<span>{game["date"].strftime("%a, %b")} {game["date"].day}</span>',
+            f'<div class="flex items-center opponent-logo"><span class="pr2">{"vs" if game["home"] else "@"}</span>'
+            f'<span class="tc pr2"><a href="/nba/team/_/name/x"><img alt="" src="logo.png"/></a></span>'
+            f'<span><a class="AnchorLink" href="/nba/team/_/name/x">{game["opponent"]}</a></span></div>',
+            f'<span class="fw-bold {result_class}">{"W" if game["win"] else "L"}</span>'
+            f'<span class="ml4"><a class="AnchorLink" href="/nba/game/_/gameId/1">{game["score"]}{game["overtime"]}</a></span>',
+            game["record"],
+        ]
+        cells += [f'<a class="AnchorLink" href="/nba/player/_/id/1">{player}</a><span>{value}</span>'
+                  for player, value in game["highs"]]
+        rows.append(row.format(index, "".join(cell.format(content) for content in cells)))
+
+    # page content around the table, links and an inline script blob like the real site
+    nav = "".join(f'<li class="NavMenu__Item"><a class="AnchorLink" href="/nba/{i}">Link {i}</a></li>' for i in range(200))
+    script_size = max(0, filler_kb * 1024 - len(nav))
+    script = '{"page":{"content":"' + ("x" * script_size) + '"}}'
+
+    return (f'<!DOCTYPE html><html lang="en"><head><title>Golden State Warriors {year} Schedule</title>'
+            f'<script>window.__espnfitt__={script};</script></head><body>'
+            f'<header><nav><ul>{nav}</ul></nav></header>'
+            f'<section class="Card"><div class="Table__Title">{year - 1}-{str(year)[2:]} Regular Season Schedule</div>'
+            f'<div class="Table__ScrollerWrapper"><table class="Table"><tbody class="Table__TBODY">{"".join(rows)}'
+            f'</tbody></table></div></section>'
+            f'<footer><ul>{nav}</ul></footer></body></html>')
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import requests
+
+from config import HTTP_CACHE_MAX_BYTES, SEASON_TIME_RANGES
+
+CACHE_INDEX = "index.json"
+
+
+def is_completed_season(year, today=None):
+    """
+    Checks if a season from SEASON_TIME_RANGES has already ended, so its pages will not change.
+
+    :param year: season year
+    :param today: date to compare against, defaults to today
+    :return: True if season is listed and has ended
+    """
+    today = pd.Timestamp.today().normalize() if today is None else pd.to_datetime(today)
+    for season, _, end_date in SEASON_TIME_RANGES:
+        if season == year:
+            return pd.to_datetime(end_date) < today
+    return False
+
+
+class ResponseCache:
+    """
+    Persistent cache of HTTP response bodies keyed by URL. Each entry keeps the ETag and
+    Last-Modified validators for conditional revalidation, and the cache is held under a
+    size cap by evicting the least recently used entries.
+    """
+
+    def __init__(self, cache_dir, max_bytes=HTTP_CACHE_MAX_BYTES):
+        """
+        :param cache_dir: directory to store cached responses in
+        :param max_bytes: max total size of cached bodies
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, CACHE_INDEX)
+        self.dirty = False
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # load index of cached entries, starting over if it is missing or unreadable
+        try:
+            with open(self.index_path, encoding="utf-8") as file:
+                self.index = json.load(file)
+        except (OSError, ValueError):
+            self.index = {}
+
+    @staticmethod
+    def key(url):
+        """
+        :param url: requested url
+        :return: cache key for url
+        """
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def body_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.body")
+
+    def lookup(self, url):
+        """
+        Finds the cache entry for a url whose body is still on disk.
+
+        :param url: requested url
+        :return: entry dictionary or None
+        """
+        with self._lock:
+            entry = self.index.get(self.key(url))
+        if entry is None or not os.path.exists(self.body_path(self.key(url))):
+            return None
+        return entry
+
+    @staticmethod
+    def is_fresh(entry, ttl):
+        """
+        Checks if an entry can be served without contacting the server.
+
+        :param entry: cache entry
+        :param ttl: seconds an entry stays fresh, None never expires
+        :return: True if entry is immutable or younger than ttl
+        """
+        if entry.get("immutable") or ttl is None:
+            return True
+        return time.time() - entry["fetched_at"] < ttl
+
+    @staticmethod
+    def conditional_headers(entry):
+        """
+        :param entry: cache entry
+        :return: If-None-Match/If-Modified-Since headers for revalidating entry
+        """
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def response(self, url, entry):
+        """
+        Rebuilds a requests Response from a cache entry and marks the entry as recently used. The index is
+        only written by the next store or flush, so cache hits do not rewrite it every time.
+
+        :param url: requested url
+        :param entry: cache entry
+        :return: requests Response with `from_cache` set to True
+        """
+        key = self.key(url)
+        with open(self.body_path(key), "rb") as file:
+            body = file.read()
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.url = url
+        response.encoding = entry.get("encoding")
+        response.headers.update(entry.get("headers", {}))
+        response.from_cache = True
+
+        with self._lock:
+            entry["last_used"] = time.time()
+            self.dirty = True
+        return response
+
+    def revalidated(self, url, entry, immutable=False):
+        """
+        Refreshes an entry after the server answered 304 Not Modified.
+
+        :param url: requested url
+        :param entry: cache entry
+        :param immutable: never revalidate entry again
+        :return: cached requests Response
+        """
+        with self._lock:
+            entry["fetched_at"] = time.time()
+            entry["immutable"] = entry.get("immutable", False) or immutable
+        return self.response(url, entry)
+
+    def store(self, url, response, immutable=False):
+        """
+        Saves a successful response body and its validators, then evicts old entries over the size cap.
+
+        :param url: requested url
+        :param response: requests Response
+        :param immutable: never revalidate entry
+        """
+        key = self.key(url)
+        body = response.content
+        tmp_path = f"{self.body_path(key)}.tmp{threading.get_ident()}"
+        with open(tmp_path, "wb") as file:
+            file.write(body)
+        os.replace(tmp_path, self.body_path(key))
+
+        now = time.time()
+        with self._lock:
+            self.index[key] = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "headers": {name: response.headers[name] for name in ("Content-Type",) if name in response.headers},
+                "encoding": response.encoding,
+                "size": len(body),
+                "immutable": immutable,
+                "fetched_at": now,
+                "last_used": now,
+            }
+        self.evict()
+        self.save()
+
+    def evict(self):
+        """Removes least recently used entries until cached bodies fit under the size cap."""
+        with self._lock:
+            total = sum(entry["size"] for entry in self.index.values())
+            for key, entry in sorted(self.index.items(), key=lambda item: item[1]["last_used"]):
+                if total <= self.max_bytes:
+                    break
+                total -= entry["size"]
+                del self.index[key]
+                try:
+                    os.remove(self.body_path(key))
+                except OSError:
+                    pass
+
+    def save(self):
+        """Writes the cache index to disk."""
+        with self._lock:
+            tmp_path = f"{self.index_path}.tmp{threading.get_ident()}"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self.index, file)
+            os.replace(tmp_path, self.index_path)
+            self.dirty = False
+
+    def flush(self):
+        """Writes the cache index to disk if cache hits changed it since it was last saved."""
+        if self.dirty:
+            self.save()
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import TEAM_AND_SPONSORS, SPONSOR_REGISTRY, LAG_WINDOW
+from correlations import masked_pearson
+from sponsors import count_column
+
+
+def lag_series(df):
+    """
+    :param df: combined data from load_all_data
+    :return: list of trend and article count columns of df to build leads and lags of
+    """
+    columns = TEAM_AND_SPONSORS + ['Article_Count'] + [count_column(sponsor) for sponsor in SPONSOR_REGISTRY]
+    return [column for column in columns if column in df.columns]
+
+def lag_column(column, lag):
+    """
+    :param column: name of series
+    :param lag: days the series is shifted by like DataFrame.shift, negative for a lead
+    :return: formula-safe column name, e.g. Rakuten_lag2 or UnitedAirlines_lead1, the column itself for lag 0
+    """
+    if lag == 0:
+        return column
+    return f"{column.replace(' ','')}_{'lag' if lag > 0 else 'lead'}{abs(lag)}"
+
+
+class LagWindow:
+    """
+    Every lead and lag within a window of days of several daily series, as one strided view over a
+    single NaN-padded copy of the series instead of one shifted copy per column and lag. values[t, j, i]
+    is series j on day t - lags[i], so lag -1 is the next day's value like the <keyword>_adjusted
+    columns, and every lag of every series can be correlated or regressed on at once.
+    """
+
+    def __init__(self, df, columns=None, window=LAG_WINDOW):
+        """
+        :param df: DataFrame with one row per consecutive day, e.g. from load_all_data
+        :param columns: list of series to lag, every trend and article count column if not given
+        :param window: largest lead and lag in days
+        """
+        self.index = df.index
+        self.columns = list(columns) if columns is not None else lag_series(df)
+        self.lags = np.arange(-window, window + 1)
+
+        # one contiguous array of days by series, padded so days outside df read as missing
+        padded = np.full((len(df) + 2 * window, len(self.columns)), np.nan)
+        padded[window:window + len(df)] = df[self.columns].to_numpy(dtype="float64", na_value=np.nan)
+        self.padded = padded
+
+        # window i of day t starts at padded day t, i.e. day t + i - window, reversed so lags run from -window to window
+        self.values = sliding_window_view(padded, len(self.lags), axis=0)[:, :, ::-1]
+
+    def lag_columns(self, lags=None):
+        """
+        :param lags: list of lags, every lag of the window if not given
+        :return: list of (series, lag, column name) in the order of frame columns
+        """
+        lags = self.lags if lags is None else lags
+        return [(column, lag, lag_column(column, lag)) for column in self.columns for lag in lags]
+
+    def frame(self, lags=None):
+        """
+        :param lags: list of lags, every lag of the window if not given
+        :return: DataFrame indexed like df with one column per series and lag
+        """
+        lags = self.lags if lags is None else np.asarray(lags)
+        positions = np.searchsorted(self.lags, lags)
+        names = [name for _, _, name in self.lag_columns(lags)]
+        return pd.DataFrame(self.values[:, :, positions].reshape(len(self.index), -1), index=self.index, columns=names)
+
+    def correlate(self, target):
+        """
+        Pearson correlation of a target with every lead and lag of every series in one vectorized
+        pass, each pair over the days where both are present.
+
+        :param target: Series or numpy array aligned with df, e.g. all_df['Abs_Point_Difference']
+        :return: DataFrame with one row per series and lag of columns series, lag, r and n
+        """
+        y = np.asarray(target, dtype="float64")[:, None, None]
+
+        # each series and lag only uses days it shares with the target
+        r, n = masked_pearson(self.values, y, ~np.isnan(self.values) & ~np.isnan(y))
+
+        return pd.DataFrame({"series": np.repeat(self.columns, len(self.lags)),
+                             "lag": np.tile(self.lags, len(self.columns)),
+                             "r": r.ravel(),
+                             "n": n.ravel()})
+
+def add_lag_columns(df, lags, columns=None):
+    """
+    Adds lead and lag columns to a DataFrame for regression formulas, e.g. 'Rakuten_lead3 ~ Rakuten_Count'.
+    Lags are taken over consecutive days of df, so lag seasons from the full data before splitting it.
+
+    :param df: DataFrame with one row per consecutive day
+    :param lags: list of lags, negative for leads
+    :param columns: list of series to lag, every trend and article count column if not given
+    :return: copy of df with the lag columns added
+    """
+    window = int(np.max(np.abs(lags))) if len(lags) else 0
+    lagged = LagWindow(df, columns, window).frame([lag for lag in lags if lag != 0])
+    return pd.concat([df, lagged.drop(columns=[column for column in lagged.columns if column in df.columns])], axis=1)
@@ -1,87 +1,367 @@
-import requests
+import gzip
 import json
 import os
+import threading
+import time
 import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import lxml.html
 from bs4 import BeautifulSoup
-from pytrends import dailydata
+
+from config import (START_DATE, ARTICLE_WORKERS, INCREMENTAL_ARTICLE_WORKERS, ARTICLE_WATERMARK_JSON, ARTICLE_STREAM_DEDUPE_WINDOW,
+                    HTTP_CACHE_DIR, ARTICLES_CACHE_TTL, STATS_CACHE_TTL, STATS_PARSER, ARTIFACT_STORE_DIR, OFFLINE,
+                    ARTICLE_CAPTURE, STATS_CAPTURE, GDRIVE_DOWNLOAD_URL)
+from artifact_store import ArtifactStore
+from fetcher import Fetcher, CircuitOpenError
+from http_cache import ResponseCache, is_completed_season
+from pipeline import inherit_stage_output
+from trends import get_daily_trends
+
+# caches and stores opened by loaders, one instance per directory so loaders running at once in threads
+# write one shared index instead of overwriting each other's
+OPEN_STORES = {}
+OPEN_STORES_LOCK = threading.Lock()
+
+def open_store(store_class, store_dir):
+    """
+    :param store_class: ResponseCache or ArtifactStore
+    :param store_dir: directory of cache or store
+    :return: instance of store_class shared by every loader using store_dir
+    """
+    key = (store_class, os.path.abspath(store_dir))
+    with OPEN_STORES_LOCK:
+        if key not in OPEN_STORES:
+            OPEN_STORES[key] = store_class(store_dir)
+        return OPEN_STORES[key]
 
 # --- Load News Articles from Golden State Warriors Website ---
+# columns of the raw articles CSV
+ARTICLE_COLUMNS = ["Title", "Date", "Excerpt", "Url", "Author"]
+
+def parse_article(article):
+    """
+    Parses a single item from the GSW News API into an articles row.
+
+    :param article: item dictionary from API response
+    :return: dictionary of title, date, blurb, url link, author
+    """
+    return {
+        "Title": article.get("title"),
+        "Date": article.get("date"),
+        "Excerpt": article.get("excerpt"),
+        "Url": article.get("permalink"),
+        "Author": (
+            article["authors"][0]["name"] 
+            if article.get("authors") and len(article["authors"]) > 0 
+            else None
+        )
+    }
+
+def article_date_range(dates):
+    """
+    Finds the oldest and newest publish dates in a list of GSW News API dates.
+
+    :param dates: list of article date strings
+    :return: tuple of timezone naive pandas Timestamps, (None, None) if no date can be read
+    """
+    dates = pd.to_datetime(pd.Series(dates, dtype=object), errors="coerce", utc=True)
+    if dates.isna().all():
+        return None, None
+
+    return dates.min().tz_convert(None), dates.max().tz_convert(None)
+
+def fetch_article_page(fetcher, api_url, page_number):
+    """
+    Requests one page of the GSW News API.
+
+    :param fetcher: Fetcher to send request with
+    :param api_url: base API URL to request data from GSW News website
+    :param page_number: page of API to request
+    :return: parsed json dictionary or None
+    :raises CircuitOpenError: if the source has stopped being requested
+    """
+    try:
+        # format url with page number and create API request
+        response = fetcher.get(api_url.format(page_number))
+        # parse request as json file
+        return response.json()
+    # let the caller abort the source once its circuit is open
+    except CircuitOpenError:
+        raise
+    # return exception if error occurs
+    except Exception as e:
+        print(f"Error loading GSW news data from page {page_number}: {e}")
+        return None
+
+def create_cache(extract_dir, use_cache=True):
+    """
+    Opens the on-disk response cache inside the data directory.
+
+    :param extract_dir: data directory the cache is placed in
+    :param use_cache: return None to disable caching
+    :return: ResponseCache or None
+    """
+    if not use_cache:
+        return None
+    return open_store(ResponseCache, os.path.join(extract_dir, HTTP_CACHE_DIR))
+
+def load_watermark(watermark_path):
+    """
+    Loads the articles sync watermark saved by a previous run.
+
+    :param watermark_path: path to watermark JSON file
+    :return: tuple of newest article date (Timestamp or None), set of ingested permalinks and whether
+             every article up to the newest date was ingested
+    """
+    try:
+        with open(watermark_path, encoding="utf-8") as file:
+            watermark = json.load(file)
+    # start from scratch if watermark is missing or unreadable
+    except (OSError, ValueError):
+        return None, set(), True
+
+    newest_date = watermark.get("newest_date")
+    return (pd.to_datetime(newest_date) if newest_date else None), set(watermark.get("permalinks", [])), watermark.get("complete", True)
+
+def save_watermark(watermark_path, article_df, newest_date=None, permalinks=(), complete=True):
+    """
+    Saves the newest article date and every ingested permalink, merged with the previous watermark.
+    The newest date only moves forward after a run that missed no page, so the next incremental run
+    pages back to the previous newest date and fills the gap.
+
+    :param watermark_path: path to watermark JSON file
+    :param article_df: articles ingested in this run
+    :param newest_date: newest article date of previous watermark
+    :param permalinks: permalinks of previous watermark
+    :param complete: False if a page of this run failed to load
+    """
+    permalinks = set(permalinks)
+    if not article_df.empty:
+        permalinks.update(article_df["Url"].dropna())
+        _, run_newest = article_date_range(article_df["Date"].tolist())
+        if complete and run_newest is not None and (newest_date is None or run_newest > newest_date):
+            newest_date = run_newest
+
+    try:
+        with open(watermark_path, "w", encoding="utf-8") as file:
+            json.dump({
+                "newest_date": newest_date.isoformat() if newest_date is not None else None,
+                "complete": complete,
+                "permalinks": sorted(permalinks),
+            }, file, indent=4)
+    # return exception if error occurs
+    except Exception as e:
+        print(f"Error saving GSW news watermark: {e}")
+
+def fetch_article_pages(fetcher, api_url, workers):
+    """
+    Requests pages of the GSW News API concurrently, with at most `workers` pages in flight,
+    and yields them in page order. Closing the generator cancels pages still in flight.
+
+    :param fetcher: Fetcher to send requests with
+    :param api_url: base API URL to request data from GSW News website
+    :param workers: max number of pages requested at once
+    :return: generator of (page number, parsed json dictionary), with None for a page that failed to load
+             or where paging was aborted, so callers know pages were missed
+    """
+    with ThreadPoolExecutor(max_workers=workers, initializer=inherit_stage_output()) as executor:
+        # keep a window of pages in flight, always consuming the lowest page next so results stay in page order
+        in_flight = {page: executor.submit(fetch_article_page, fetcher, api_url, page) for page in range(1, workers + 1)}
+        next_page = workers + 1
+        page_number = 1
+        failed_pages = 0
+
+        try:
+            while page_number in in_flight:
+                try:
+                    data = in_flight.pop(page_number).result()
+                # stop paging if the source keeps failing
+                except CircuitOpenError as e:
+                    print(f"Aborting GSW news data load: {e}")
+                    yield page_number, None
+                    return
+
+                # report pages that failed to load, stopping if a full window of pages in a row failed
+                if data is None:
+                    yield page_number, None
+                    failed_pages += 1
+                    if failed_pages >= workers:
+                        print("Too many GSW news pages failed in a row, stopping")
+                        return
+                else:
+                    failed_pages = 0
+                    yield page_number, data
+
+                # add 1 to page number and request the next page past the window to continue
+                page_number += 1
+                in_flight[next_page] = executor.submit(fetch_article_page, fetcher, api_url, next_page)
+                next_page += 1
+        finally:
+            # drop requests for pages past the stop point
+            for future in in_flight.values():
+                future.cancel()
+
+def replay_article_pages(capture_path):
+    """
+    Yields GSW News API pages saved by an earlier run, without using the network.
+
+    :param capture_path: path to compressed NDJSON capture of API pages
+    :return: generator of (page number, parsed json dictionary)
+    """
+    with gzip.open(capture_path, "rt", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                yield record["page"], record["data"]
+
 def get_gsw_articles_api(api_url, json_file, dataset_file, **kwargs):
     """
     Retrieves article information from API URL, saves raw data to JSON file
-    and CSV, and loads the data to a pandas DataFrame. 
+    and CSV, and loads the data to a pandas DataFrame. Pages are requested concurrently
+    over a shared pooled session, with at most `workers` pages in flight, and processed
+    in page order until a page's oldest article predates the start date. Failed requests
+    are retried with backoff by a Fetcher, whose counters are printed at the end.
+    Articles are deduplicated by permalink, since the feed can shift while paging.
+
+    Every page is streamed to a compressed NDJSON capture as it arrives. In replay mode
+    the DataFrame is rebuilt from that capture without network access.
+
+    In incremental mode, paging stops at the first page containing an article already
+    recorded in the watermark, and only new articles are appended to the CSV and returned.
 
     :param api_url: base API URL to request data from GSW News website
     :param json_file: JSON file to extract data and examine format
     :param dataset_file: CSV file to place raw data from pandas DataFrame
     :param extract_dir: data directory to place extracted data into
+    :param workers: max number of pages requested at once
+    :param start_date: stop paging once articles are older than this date
+    :param fetcher: Fetcher to send requests with, one is created if not given
+    :param use_cache: serve pages from the on-disk response cache
+    :param incremental: only retrieve articles newer than the saved watermark
+    :param replay: rebuild data from the pages captured by earlier runs instead of the API
     :return: Pandas DataFrame or None
     """
 
     articles = []
-    page_number = 1
 
-    # extract data directory
+    # extract data directory and stop date
     extract_dir = kwargs.get("extract_dir", ".")
+    start_date = pd.to_datetime(kwargs.get("start_date", START_DATE))
+    replay = kwargs.get("replay", False)
     os.makedirs(extract_dir, exist_ok=True)
 
     # path to place files into data folder
     json_path = os.path.join(extract_dir, json_file)
     csv_path = os.path.join(extract_dir, dataset_file)
+    watermark_path = os.path.join(extract_dir, ARTICLE_WATERMARK_JSON)
+    capture_path = os.path.join(extract_dir, ARTICLE_CAPTURE)
 
-    # create while loop to continue retrieving articles until reaching 900 total articles
-    print("loading data from GSW News website")
-    while len(articles) < 900:
-        try:
-            # format url with page number starting at 1 and create API request
-            article_url_with_page = api_url.format(page_number)
-            response = requests.get(article_url_with_page,timeout=10)
-            response.raise_for_status()
-            # parse request as json file and retrieve articles (aka items)
-            data = response.json()
-        except Exception as e:
-            print(f"Error loading GSW news data from page {page_number}: {e}")
-            continue
-        # write page 1 request to json file to examine data for processing
-        if page_number == 1:
-            try:
-                with open(json_path,'w',encoding='utf-8') as file:
-                    json.dump(data,file,indent=4,ensure_ascii=False)
-                    print("articles json file has been created")
-            # return exception if error occurs
-            except Exception as e:
-                print(f"Error saving GSW news data to JSON file: {e}")
+    # incremental runs need an existing csv and watermark, otherwise do a full load
+    newest_date, known_permalinks, watermark_complete = None, set(), True
+    incremental = kwargs.get("incremental", False) and not replay and os.path.exists(csv_path)
+    if incremental:
+        newest_date, known_permalinks, watermark_complete = load_watermark(watermark_path)
+        incremental = bool(known_permalinks)
+
+    # a refresh usually stops on page 1, so keep few pages in flight
+    workers = max(1, kwargs.get("workers", INCREMENTAL_ARTICLE_WORKERS if incremental else ARTICLE_WORKERS))
+    seen_permalinks = set()
+    reached_known = False
+    missed_pages = []
+
+    if replay:
+        # captures of incremental runs are appended, so replay every captured page
+        if not os.path.exists(capture_path):
+            print(f"Error replaying GSW news data: no capture found at {capture_path}")
+            return None
+        print("replaying data from GSW News capture")
+        pages = replay_article_pages(capture_path)
+        fetcher = capture = None
+    else:
+        print(f"loading {'new ' if incremental else ''}data from GSW News website")
+        fetcher = kwargs.get("fetcher") or Fetcher("GSW News", pool_size=workers, ttl=ARTICLES_CACHE_TTL,
+                                                    cache=create_cache(extract_dir, kwargs.get("use_cache", True)))
+        pages = fetch_article_pages(fetcher, api_url, workers)
+        capture = gzip.open(capture_path, "at" if incremental else "wt", encoding="utf-8")
+
+    try:
+        for page_number, data in pages:
+            # articles of a page that failed to load are missing, so the watermark must not move past them
+            if data is None:
+                missed_pages.append(page_number)
                 continue
-        
-        # parse items from data
-        items = data.get("items",[])
-        print(f"parsing articles from page {page_number}")
 
-        # for each item in page, append to articles list (title, date, blurb, url link, author)
-        for article in items:
-            try:
-                articles.append({
-                        "Title": article.get("title"),
-                        "Date": article.get("date"),
-                        "Excerpt": article.get("excerpt"),
-                        "Url": article.get("permalink"),
-                        "Author": (
-                            article["authors"][0]["name"] 
-                            if article.get("authors") and len(article["authors"]) > 0 
-                            else None
-                        )
-                    })
-            # return exception if error occurs
-            except Exception as e:
-                print(f"Error appending GSW news article to articles DataFrame: {e}")
+            # stream raw page to capture file as it arrives
+            if capture is not None:
+                capture.write(json.dumps({"page": page_number, "fetched_at": time.time(), "data": data}, ensure_ascii=False) + "\n")
+
+            # write page 1 request to json file to examine data for processing
+            if page_number == 1 and not replay:
+                try:
+                    with open(json_path,'w',encoding='utf-8') as file:
+                        json.dump(data,file,indent=4,ensure_ascii=False)
+                        print("articles json file has been created")
+                # return exception if error occurs
+                except Exception as e:
+                    print(f"Error saving GSW news data to JSON file: {e}")
+
+            # parse items from data, an empty page means the end of the feed
+            items = data.get("items",[])
+            if not items:
+                if replay:
+                    continue
+                break
+            print(f"parsing articles from page {page_number}")
+
+            # for each item in page, append to articles list (title, date, blurb, url link, author)
+            for article in items:
+                try:
+                    row = parse_article(article)
+                # return exception if error occurs
+                except Exception as e:
+                    print(f"Error appending GSW news article to articles DataFrame: {e}")
+                    continue
+
+                # skip articles that were already ingested or already seen on an earlier page
+                permalink = row["Url"]
+                if permalink is not None:
+                    if permalink in known_permalinks:
+                        reached_known = True
+                        continue
+                    if permalink in seen_permalinks:
+                        continue
+                    seen_permalinks.add(permalink)
+                articles.append(row)
+
+            # stop once the page reaches ingested articles or articles from before the start date, after an earlier
+            # run missed pages only once the page reaches its newest date, since ingested articles follow the gap
+            if replay:
                 continue
-            
-        # add 1 to page number to continue to next page
-        page_number += 1
+            oldest_date, _ = article_date_range([item.get("date") for item in items])
+            if (reached_known and watermark_complete) or (oldest_date is not None and oldest_date < start_date):
+                break
+            if incremental and newest_date is not None and oldest_date is not None and oldest_date < newest_date:
+                break
+    finally:
+        pages.close()
+        if capture is not None:
+            capture.close()
+        if fetcher is not None:
+            fetcher.flush()
+            print(fetcher.summary())
+
     try:
-        # convert list of articles to dataframe then to csv
-        article_df = pd.DataFrame(articles)
-        article_df.to_csv(csv_path, index=False)
+        # convert list of articles to dataframe then to csv, appending new articles on incremental runs
+        article_df = pd.DataFrame(articles, columns=ARTICLE_COLUMNS)
+        if incremental:
+            article_df.to_csv(csv_path, mode="a", header=False, index=False)
+            print(f"appended {len(article_df)} new articles")
+        else:
+            article_df.to_csv(csv_path, index=False)
+        if missed_pages:
+            print(f"GSW news pages {', '.join(map(str, missed_pages))} failed to load, the next incremental run will retrieve them")
+        save_watermark(watermark_path, article_df, newest_date, known_permalinks, complete=not missed_pages)
 
         # return article dataframe
         return article_df
@@ -90,11 +370,176 @@ def get_gsw_articles_api(api_url, json_file, dataset_file, **kwargs):
         print(f"Error saving GSW news data to CSV file: {e}")
         return None
 
+def iter_gsw_articles(api_url, **kwargs):
+    """
+    Streams articles from the GSW News API one page at a time as pages arrive, without keeping
+    earlier pages or writing the raw JSON and CSV files, so memory stays the same however long
+    the feed is. Pages are requested like get_gsw_articles_api and paging stops at the first page
+    whose oldest article predates the start date. Articles the shifting feed repeats are dropped
+    by checking the most recent permalinks only.
+
+    :param api_url: base API URL to request data from a news website with the GSW News API format
+    :param extract_dir: data directory of the response cache
+    :param workers: max number of pages requested at once
+    :param start_date: stop paging once articles are older than this date
+    :param fetcher: Fetcher to send requests with, one is created if not given
+    :param use_cache: serve pages from the on-disk response cache
+    :param dedupe_window: number of recent permalinks checked for duplicates
+    :return: generator of lists of article row dictionaries, one list per page
+    """
+    extract_dir = kwargs.get("extract_dir", ".")
+    start_date = pd.to_datetime(kwargs.get("start_date", START_DATE))
+    workers = max(1, kwargs.get("workers", ARTICLE_WORKERS))
+    dedupe_window = kwargs.get("dedupe_window", ARTICLE_STREAM_DEDUPE_WINDOW)
+
+    print(f"streaming data from {api_url.format('')}")
+    fetcher = kwargs.get("fetcher") or Fetcher("GSW News", pool_size=workers, ttl=ARTICLES_CACHE_TTL,
+                                                cache=create_cache(extract_dir, kwargs.get("use_cache", True)))
+    pages = fetch_article_pages(fetcher, api_url, workers)
+    recent_permalinks = OrderedDict()
+
+    try:
+        for page_number, data in pages:
+            # skip pages that failed to load
+            if data is None:
+                continue
+
+            # an empty page means the end of the feed
+            items = data.get("items",[])
+            if not items:
+                break
+
+            rows = []
+            for article in items:
+                try:
+                    row = parse_article(article)
+                # return exception if error occurs
+                except Exception as e:
+                    print(f"Error parsing GSW news article: {e}")
+                    continue
+
+                # skip articles seen on a recent page, forgetting the oldest permalinks past the window
+                permalink = row["Url"]
+                if permalink is not None:
+                    if permalink in recent_permalinks:
+                        continue
+                    recent_permalinks[permalink] = None
+                    if len(recent_permalinks) > dedupe_window:
+                        recent_permalinks.popitem(last=False)
+                rows.append(row)
+            yield rows
+
+            # stop once the page reaches articles from before the start date
+            oldest_date, _ = article_date_range([item.get("date") for item in items])
+            if oldest_date is not None and oldest_date < start_date:
+                break
+    finally:
+        pages.close()
+        fetcher.flush()
+        print(fetcher.summary())
+
 # --- Load Game Statistics From ESPN Website ---
+def stats_row(year, cells):
+    """
+    Builds a game stats row from the text of the 7 cells of an ESPN schedule table row.
+
+    :param year: season year
+    :param cells: list of cell text, each cell as its stripped text pieces
+    :return: dictionary of game stats
+    """
+    return {
+        "Season": year,
+        "Date": "".join(cells[0]),
+        "Opponent": " ".join(cells[1]),
+        "Result": " ".join(cells[2]),
+        "Record": "".join(cells[3]),
+        "Hi Points": " ".join(cells[4]),
+        "Hi Rebounds": " ".join(cells[5]),
+        "Hi Assists": " ".join(cells[6])
+    }
+
+def parse_stats_table_bs4(html, year):
+    """
+    Parses game rows from an ESPN schedule page by building a full BeautifulSoup tree of the page.
+
+    :param html: ESPN schedule page HTML
+    :param year: season year
+    :return: list of game stats dictionaries or None if no table is found
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    # find game stats table in html
+    table = soup.find("table", class_="Table")
+    if not table:
+        return None
+
+    games = []
+    # Extract game rows (each <tr> with data-testid attributes)
+    for row in table.find_all("tr", class_="Table__TR--sm"):
+        try:
+            # find row data
+            columns = row.find_all("td", class_="Table__TD")
+
+            # if number of columns match header but is not a header, then retrieve cell information and append to games list
+            if len(columns) == 7:
+                cells = [list(column.stripped_strings) for column in columns]
+                # skip row if header
+                if " ".join(cells[0]) != "DATE":
+                    games.append(stats_row(year, cells))
+        # return exception if error occurs
+        except Exception as e:
+            print(f"Error loading row stats data to stats list: {e}")
+            continue
+
+    return games
+
+# XPath class matches behave like BeautifulSoup's class_ filter, matching one class out of the class list
+TABLE_XPATH = "//table[contains(concat(' ', normalize-space(@class), ' '), ' Table ')]"
+ROW_XPATH = ".//tr[contains(concat(' ', normalize-space(@class), ' '), ' Table__TR--sm ')]"
+CELL_XPATH = ".//td[contains(concat(' ', normalize-space(@class), ' '), ' Table__TD ')]"
+
+def parse_stats_table_lxml(html, year):
+    """
+    Parses game rows from an ESPN schedule page with lxml, only walking the first `table.Table`
+    subtree and reading each row's cell text in one pass.
+
+    :param html: ESPN schedule page HTML
+    :param year: season year
+    :return: list of game stats dictionaries or None if no table is found
+    """
+    # find game stats table in html
+    tables = lxml.html.fromstring(html).xpath(TABLE_XPATH)
+    if not tables:
+        return None
+
+    games = []
+    for row in tables[0].xpath(ROW_XPATH):
+        try:
+            # text of every cell as its stripped, non-empty pieces (same as get_text with strip=True)
+            cells = [[text.strip() for text in column.itertext() if text.strip()] for column in row.xpath(CELL_XPATH)]
+
+            # keep rows with 7 cells that are not a header row
+            if len(cells) == 7 and " ".join(cells[0]) != "DATE":
+                games.append(stats_row(year, cells))
+        # return exception if error occurs
+        except Exception as e:
+            print(f"Error loading row stats data to stats list: {e}")
+            continue
+
+    return games
+
+# engines available to parse ESPN schedule pages
+STATS_PARSERS = {
+    "lxml": parse_stats_table_lxml,
+    "bs4": parse_stats_table_bs4,
+}
+
 def get_gsw_game_stats_webscrape(webscrape_url,html_file, dataset_file,**kwargs):
     """
     Scrapes statistics table from ESPN's GSW season schedule, saves raw data to HTML file
-    and CSV, and loads the data to a pandas DataFrame. 
+    and CSV, and loads the data to a pandas DataFrame. Every season page is saved as
+    compressed HTML, and in replay mode the DataFrame is rebuilt from those captures
+    without network access.
 
     :param webscrape_url: base webscrape URL to request data from ESPN website
     :param html_file: HTML file to extract data and examine format
@@ -102,13 +547,19 @@ def get_gsw_game_stats_webscrape(webscrape_url,html_file, dataset_file,**kwargs)
     :param start_year: first year to begin pulling season data
     :param end_year: last year to pull season data
     :param extract_dir: data directory to place extracted data into
+    :param fetcher: Fetcher to send requests with, one is created if not given
+    :param use_cache: serve pages from the on-disk response cache, completed seasons are never re-requested
+    :param parser: engine to parse pages with, "lxml" (table only) or "bs4" (full page tree)
+    :param replay: rebuild data from the pages captured by earlier runs instead of the website
     :return: Pandas DataFrame or None
     """
         
     all_games = []
 
-    # extract data directory
+    # extract data directory, parsing engine and replay mode
     extract_dir = kwargs.get("extract_dir", ".")
+    parse_table = STATS_PARSERS[kwargs.get("parser", STATS_PARSER)]
+    replay = kwargs.get("replay", False)
     os.makedirs(extract_dir, exist_ok=True)
 
     # path to place files into data folder
@@ -120,76 +571,61 @@ def get_gsw_game_stats_webscrape(webscrape_url,html_file, dataset_file,**kwargs)
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
                     "AppleWebKit/537.36 (KHTML, like Gecko) "
     }
+    fetcher = None
+    if not replay:
+        fetcher = kwargs.get("fetcher") or Fetcher("ESPN stats", headers=user_agent, ttl=STATS_CACHE_TTL,
+                                                    cache=create_cache(extract_dir, kwargs.get("use_cache", True)))
+
     # create for loop to retrieve game stats for multiple seasons
     for year in range(2021, 2026):  # 2021–2026 inclusive
-        try:
-            # format url with year starting at start year, create webscrape request and parse with beautifulsoup
-            url = webscrape_url.format(year)
-            response = requests.get(url, headers=user_agent,timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, "html.parser")
-        # return exception if error occurs
-        except Exception as e:
-            print(f"Error loading GSW stats data from year {year}: {e}")
-            continue
-        
-        try:
-            # write first year request to html file to examine data
-            if year == 2021:
-                with open(html_path, "w", encoding="utf-8") as file:
-                    file.write(str(soup.prettify()))
-        # return exception if error occurs
-        except Exception as e:
-            print(f"Error loading GSW stats data to HTML file: {e}")
-            continue
+        capture_path = os.path.join(extract_dir, STATS_CAPTURE.format(year))
 
-        # find game stats table in html
-        table = soup.find("table", class_="Table")
-        if not table:
-            print(f"No table found for {year}")
-            continue
-
-        # Extract header names
-        headers_row = table.find_all("td", class_="Table_Headers")
-        headers_list = [h.get_text(strip=True) for h in headers_row]
-        if not headers_list:
-            headers_list = ["DATE", "OPPONENT", "RESULT", "W-L", "Hi Points", "Hi Rebounds", "Hi Assists"]
-
-        # Extract game rows (each <tr> with data-testid attributes)
-        for row in table.find_all("tr", class_="Table__TR--sm"):
+        # rebuild from the season page captured by an earlier run
+        if replay:
             try:
-                # find row data
-                columns = row.find_all("td", class_="Table__TD")
-
-                # if number of columns match header but is not a header, then retrieve cell information and append to all_games list
-                if len(columns) == 7:
-                    # skip row if header
-                    if columns[0].get_text(" ", strip=True) == "DATE":
-                        continue
-                    else:
-                        date = columns[0].get_text(strip=True)
-                        opponent = columns[1].get_text(" ", strip=True)
-                        result = columns[2].get_text(" ", strip=True)
-                        record = columns[3].get_text(strip=True)
-                        hi_points = columns[4].get_text(" ", strip=True)
-                        hi_rebounds = columns[5].get_text(" ", strip=True)
-                        hi_assists = columns[6].get_text(" ", strip=True)
-
-                        all_games.append({
-                            "Season": year,
-                            "Date": date,
-                            "Opponent": opponent,
-                            "Result": result,
-                            "Record": record,
-                            "Hi Points": hi_points,
-                            "Hi Rebounds": hi_rebounds,
-                            "Hi Assists": hi_assists
-                        })
+                with gzip.open(capture_path, "rt", encoding="utf-8") as file:
+                    html = file.read()
             # return exception if error occurs
             except Exception as e:
-                print(f"Error loading row stats data to stats list: {e}")
+                print(f"Error replaying GSW stats data from year {year}: {e}")
                 continue
+        else:
+            try:
+                # format url with year starting at start year and create webscrape request
+                url = webscrape_url.format(year)
+                response = fetcher.get(url, immutable=is_completed_season(year))
+                html = response.text
+            # stop scraping if the source keeps failing
+            except CircuitOpenError as e:
+                print(f"Aborting GSW stats data load: {e}")
+                break
+            # return exception if error occurs
+            except Exception as e:
+                print(f"Error loading GSW stats data from year {year}: {e}")
+                continue
+
+            try:
+                # save compressed capture of every season page
+                with gzip.open(capture_path, "wt", encoding="utf-8") as file:
+                    file.write(html)
+                # write first year request to html file to examine data
+                if year == 2021:
+                    with open(html_path, "w", encoding="utf-8") as file:
+                        file.write(html)
+            # return exception if error occurs
+            except Exception as e:
+                print(f"Error loading GSW stats data to HTML file: {e}")
+
+        # parse game rows from stats table in html
+        games = parse_table(html, year)
+        if games is None:
+            print(f"No table found for {year}")
+            continue
+        all_games.extend(games)
+    if fetcher is not None:
+        fetcher.flush()
+        print(fetcher.summary())
+
     try:  
         # convert list of games to dataframe then to csv
         stats_df = pd.DataFrame(all_games)
@@ -202,87 +638,119 @@ def get_gsw_game_stats_webscrape(webscrape_url,html_file, dataset_file,**kwargs)
         return None
 
 # --- Load Daily Trend Data from Google Trends (pytrends) ---
-def get_gsw_sponsor_trends(keyword,**kwargs):
+def get_all_sponsor_trends(keywords,**kwargs):
     """
-    Retrieves daily trend (interest over time) data from Google Trends API pytrends, 
-    saves extracted dataframe to CSV, and returns the data to a pandas DataFrame or None
-    if exception occurs. 
+    Retrieves daily trend (interest over time) data from Google Trends API pytrends for several keywords,
+    saves each extracted dataframe to CSV, and returns the data as pandas DataFrames. Month windows of
+    all keywords are fetched together through a shared rate limiter and cached on disk, so only windows
+    that are missing or partial are requested.
 
-    :param keyword: keyword to request daily data from Google Trends website
+    :param keywords: keywords to request daily data from Google Trends website
     :param extract_dir: data directory to place extracted data into
-    :return: Pandas DataFrame or None
+    :param workers: number of windows requested at once
+    :return: dictionary of keyword to Pandas DataFrame or None
     """
     # extract data directory
     extract_dir = kwargs.get("extract_dir", ".")
     os.makedirs(extract_dir, exist_ok=True)
 
-    # path to place files into data folder
-    csv_path = os.path.join(extract_dir, f"{keyword.replace(' ','')}_Trends.csv")
-    
     try:
-        # retrieve the daily trend data for sponsor/gsw and add to csv using pytrends
-        trends_df = dailydata.get_daily_data(
-        word=keyword,
-        start_year=2020,
-        start_mon=12,
-        stop_year=2025,
-        stop_mon=4,
-        geo='US',
-        wait_time=5
-        )
+        # retrieve the daily trend data for sponsors/gsw month by month
+        all_trends = get_daily_trends(keywords, **kwargs)
     # return exception if error occurs
     except Exception as e:
-        print(f"Error retrieving {keyword} trends data from pytrends: {e}")
-        return None
-    
-    try:  
-        # save trends data to csv and return data as df
-        trends_df.to_csv(csv_path,index=False)
+        print(f"Error retrieving trends data from pytrends: {e}")
+        return {keyword: None for keyword in keywords}
 
-        return trends_df
-    # return exception if error occurs
-    except Exception as e:
-        print(f"Error saving {keyword} trends data to CSV file: {e}")
-        return None
+    for keyword, trends_df in all_trends.items():
+        if trends_df is None:
+            print(f"Error retrieving {keyword} trends data from pytrends, re-run to resume")
+            continue
+
+        # path to place files into data folder
+        csv_path = os.path.join(extract_dir, f"{keyword.replace(' ','')}_Trends.csv")
+        try:  
+            # save trends data to csv
+            trends_df.to_csv(csv_path,index=False)
+        # return exception if error occurs
+        except Exception as e:
+            print(f"Error saving {keyword} trends data to CSV file: {e}")
+            all_trends[keyword] = None
+
+    return all_trends
+
+def get_gsw_sponsor_trends(keyword,**kwargs):
+    """
+    Retrieves daily trend (interest over time) data from Google Trends API pytrends, 
+    saves extracted dataframe to CSV, and returns the data to a pandas DataFrame or None
+    if exception occurs. 
+
+    :param keyword: keyword to request daily data from Google Trends website
+    :param extract_dir: data directory to place extracted data into
+    :return: Pandas DataFrame or None
+    """
+    return get_all_sponsor_trends([keyword], **kwargs)[keyword]
 
 def download_gdrive_file(drive_url, dataset_file, **kwargs):
     """
     Retrieves google drive CSV files of daily trend (interest over time) data originally from Google Trends API pytrends.
-    Aaves extracted dataframe to CSV in data folder, and returns the data to a pandas DataFrame or None
-    if exception occurs. 
+    Downloads are kept in a local artifact store keyed by file ID and content hash, so a file already stored
+    with a matching hash is read locally instead of downloaded again. Saves the CSV to the data folder, and
+    returns the data to a pandas DataFrame or None if exception occurs. 
 
     :param drive_url: Google Drive url for trend data
     :param dataset_file: local csv file name
     :param extract_dir: data directory to place extracted data into
+    :param fetcher: Fetcher to send requests with, one is created if not given
+    :param offline: only read from the artifact store, never use the network
+    :param refresh: download the file again even if a verified copy is stored
+    :param download_url: download url template taking the file ID
     :return: Pandas DataFrame or None
     """
 
     # extract data directory
     extract_dir = kwargs.get("extract_dir", ".")
+    offline = kwargs.get("offline", OFFLINE)
     os.makedirs(extract_dir, exist_ok=True)
+    store = open_store(ArtifactStore, os.path.join(extract_dir, ARTIFACT_STORE_DIR))
 
     # transform gdrive url for file readability
     file_id = drive_url.split("/")[-2]
-    url = f"https://drive.google.com/uc?export=download&id={file_id}"
+    url = kwargs.get("download_url", GDRIVE_DOWNLOAD_URL).format(file_id)
 
     # path to place files into data folder
     csv_path = os.path.join(extract_dir, dataset_file)
 
+    # use stored copy if its hash still matches, otherwise download it from gdrive
+    stored_path = None if kwargs.get("refresh", False) and not offline else store.get(file_id)
+    if stored_path is None:
+        if offline:
+            print(f"Error reading sponsor trend data: {dataset_file} is not in the artifact store and offline mode is on")
+            return None
+        try:
+            fetcher = kwargs.get("fetcher") or Fetcher("Google Drive")
+            response = fetcher.get(url)
+            stored_path = store.put(file_id, response.content, source_url=url)
+        # return exception if error occurs
+        except Exception as e:
+            print(f"Error reading sponsor trend data: {e}")
+            return None
+
     try:
-        # read csv file from gdrive
-        trends_df = pd.read_csv(url)
+        # read csv file from store
+        trends_df = pd.read_csv(stored_path)
     # return exception if error occurs
     except Exception as e:
         print(f"Error reading sponsor trend data: {e}")
         return None
 
     try:
-        # save csv to raw data folder
-        trends_df.to_csv(csv_path, index=False)
+        # save csv to raw data folder unless it already holds the same contents
+        store.export(file_id, csv_path)
 
         # return article dataframe
         return trends_df
     # return exception if error occurs
     except Exception as e:
         print(f"Error saving sponsor trend data: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -1,37 +1,188 @@
+import argparse
 import os
-from config import (DATA_DIR, CLEANED_DATA_DIR, ARTICLES_RESULTS_DIR, STATS_RESULTS_DIR, TRENDS_RESULTS_DIR, ALL_RESULTS_DIR, 
-                    ARTICLES_URL, STATS_URL, TEAM_AND_SPONSORS, ALL_TRENDS_CSV)
-from process_data import process_game_data, process_article_data, process_trends_data, combine_all_data
-from analyze_data import plot_all_trends, plot_gsw_stats, plot_articles, plot_all_data
+import artifact_store, correlations, fetcher, http_cache, load_datasets, process_data, render, sponsors, storage, trends
+from config import (DATA_DIR, PIPELINE_WORKERS, ARTICLES_RESULTS_DIR, STATS_RESULTS_DIR, TRENDS_RESULTS_DIR, ALL_RESULTS_DIR,
+                    ARTICLES_URL, STATS_URL, TEAM_AND_SPONSORS, ALL_TRENDS_CSV, CLEANED_ARTICLE_CSV, SPONSOR_MENTIONS_CSV,
+                    CLEANED_STATS_CSV, ALL_DATA_DATASET, CORRELATIONS_TABLE, ALL_ARTICLES_PLOT, SEASON_ARTICLES_PLOT,
+                    ALL_STATS_PLOT, SEASON_STATS_PLOT, ALL_TRENDS_PLOT, ALL_SEASON_TRENDS_PLOT, ALL_DATA_PLOT,
+                    ALL_SEASON_DATA_PLOT, ALL_DATA_MATRIX, ADJUSTED_ALL_DATA_MATRIX, CURRY_MATRIX, ADJUSTED_CURRY_MATRIX,
+                    CURRY_WIN_MATRIX, ADJUSTED_CURRY_WIN_MATRIX, SPONSOR_MATRIX, ADJUSTED_SPONSOR_MATRIX, RAW_DATA_DIR, TRENDS_RETRIEVE_API,
+                    OFFLINE, ARTICLE_CAPTURE, STATS_CAPTURE, SEASON_TIME_RANGES, ARTIFACT_STORE_DIR)
+from process_data import (process_game_data, process_article_data, process_trends_data, retrieve_trends_data, load_raw_trends_data,
+                          combine_all_data, load_all_data, TrendsTable, TREND_FILES)
+from analyze_data import (plot_all_trends, plot_gsw_stats, plot_articles, plot_all_data, time_series_job, heatmap_job,
+                          correlation_columns, CORRELATION_MATRICES)
+from correlations import build_correlations, load_correlations
+from pipeline import Stage, Pipeline, config_values
+from storage import table_path, dataset_path, read_table
 
-if __name__ == "__main__":
-    # Create a data directory
-    os.makedirs(DATA_DIR, exist_ok=True)
+# config settings read by every cleaning stage
+DATA_CONFIG = ['START_DATE', 'END_DATE', 'STORAGE_FORMAT', 'EXPORT_CSV']
+PLOT_CONFIG = ['SEASON_TIME_RANGES', 'START_DATE', 'END_DATE']
+
+
+def print_head(name, df):
+    """
+    :param name: name of dataset
+    :param df: pandas DataFrame or None
+    :return: df
+    """
+    if df is not None:
+        print(f"\n{name} Head:\n{df.head()}")
+    return df
+
+def plot_paths(result_dir, *plot_files):
+    """
+    :param result_dir: directory plots are saved to
+    :param plot_files: plot file names or lists of them
+    :return: list of plot paths
+    """
+    paths = []
+    for plot_file in plot_files:
+        if isinstance(plot_file, (list, tuple)):
+            paths += plot_paths(result_dir, *plot_file)
+        else:
+            paths.append(f'{result_dir}/{plot_file}')
+    return paths
+
+def trend_stage_name(keyword):
+    return f"trends:{keyword}"
+
+def build_all_trends(result):
+    """
+    Collects every keyword in one table and saves it once.
+
+    :param result: function returning the result of a stage by name
+    :return: all trends DataFrame
+    """
+    trends_table = TrendsTable.load()
+    for keyword in TEAM_AND_SPONSORS:
+        trends_table.upsert(keyword, result(trend_stage_name(keyword)))
+    return trends_table.save()
+
+def build_stages():
+    """
+    :return: list of every main.py Stage in dependency order
+    """
+    stages = []
 
     # --- GSW Articles Data ---
-    articles_df = process_article_data(ARTICLES_URL)
-    if articles_df is not None:
-        print(f"\nGolden State Warriors News Articles Cleaned Data Head:\n{articles_df.head()}")
-        plot_articles(articles_df,result_dir = ARTICLES_RESULTS_DIR)
-    print("\n" + "=" * 50 + "\n")
+    # offline, articles and stats are rebuilt from the raw pages captured by earlier runs, so the captures are their inputs
+    # online, articles are retrieved incrementally, usually one or two pages. Every run refreshes the stage by cleaning only
+    # the new articles, and every raw article is cleaned again when it is forced or its cleaning code or settings changed
+    stages.append(Stage("articles",
+                        lambda result: print_head("Golden State Warriors News Articles Cleaned Data",
+                                                  process_article_data(ARTICLES_URL, incremental=True, replay=OFFLINE, reclean=True)),
+                        refresh=None if OFFLINE else lambda result: print_head("Golden State Warriors News Articles Cleaned Data",
+                                                                               process_article_data(ARTICLES_URL, incremental=True)),
+                        outputs=[table_path(CLEANED_ARTICLE_CSV), table_path(SPONSOR_MENTIONS_CSV)],
+                        load=lambda: read_table(CLEANED_ARTICLE_CSV),
+                        code=[process_data, load_datasets, sponsors, storage, fetcher, http_cache],
+                        config=config_values('ARTICLES_URL', 'SPONSORS', 'SPONSOR_REGISTRY', 'OFFLINE', *DATA_CONFIG),
+                        inputs=[os.path.join(RAW_DATA_DIR, ARTICLE_CAPTURE)] if OFFLINE else []))
 
     # --- GSW Game Stats Data ---
-    stats_df = process_game_data(STATS_URL)
-    if stats_df is not None:
-        print(f"\nGolden State Warriors Game Stats Cleaned Data Head:\n{stats_df.head()}")
-        plot_gsw_stats(stats_df,result_dir = STATS_RESULTS_DIR)
-    print("\n" + "=" * 50 + "\n")
+    stages.append(Stage("stats",
+                        lambda result: print_head("Golden State Warriors Game Stats Cleaned Data", process_game_data(STATS_URL, replay=OFFLINE)),
+                        outputs=[table_path(CLEANED_STATS_CSV)],
+                        load=lambda: read_table(CLEANED_STATS_CSV),
+                        code=[process_data, load_datasets, storage, fetcher, http_cache],
+                        config=config_values('STATS_URL', 'STATS_PARSER', 'SEASON_TIME_RANGES', 'OFFLINE', *DATA_CONFIG),
+                        inputs=[os.path.join(RAW_DATA_DIR, STATS_CAPTURE.format(year)) for year, _, _ in SEASON_TIME_RANGES] if OFFLINE else []))
 
     # --- GSW Sponsor Trends Data ---
+    # with the API every keyword is retrieved in one call, so month windows of all keywords share one rate limiter
+    trend_deps = []
+    if TRENDS_RETRIEVE_API:
+        trend_deps = ["trends_api"]
+        stages.append(Stage("trends_api", lambda result: retrieve_trends_data(TEAM_AND_SPONSORS),
+                            outputs=[os.path.join(RAW_DATA_DIR, f"{keyword.replace(' ','')}_Trends.csv") for keyword in TEAM_AND_SPONSORS],
+                            load=lambda: load_raw_trends_data(TEAM_AND_SPONSORS),
+                            code=[retrieve_trends_data, load_datasets.get_all_sponsor_trends, trends],
+                            config=config_values('TEAM_AND_SPONSORS', 'TREND_START_DATE', 'TREND_END_DATE')))
+
     for keyword in TEAM_AND_SPONSORS:
-        trends_df = process_trends_data(keyword,retrieve_api=False,all_sponsors=True)
-        if trends_df is not None:
-            print(f"\n {keyword} Trends Data Head:\n{trends_df.head()}")
-    plot_all_trends(f'{CLEANED_DATA_DIR}/{ALL_TRENDS_CSV}',result_dir = TRENDS_RESULTS_DIR)
-    print("\n" + "=" * 50 + "\n")
+        _, _, cleaned_file = TREND_FILES.get(keyword, TREND_FILES['JPMorgan Chase'])
+        stages.append(Stage(trend_stage_name(keyword),
+                            lambda result, keyword=keyword: print_head(f"{keyword} Trends Data", process_trends_data(
+                                keyword, trend_df=result("trends_api")[keyword] if TRENDS_RETRIEVE_API else None)),
+                            deps=trend_deps,
+                            outputs=[table_path(cleaned_file)],
+                            # Google Drive files are read from the artifact store, whose manifest changes when a file is stored again
+                            inputs=[] if TRENDS_RETRIEVE_API else [os.path.join(RAW_DATA_DIR, ARTIFACT_STORE_DIR, artifact_store.MANIFEST_FILE)],
+                            load=lambda cleaned_file=cleaned_file: read_table(cleaned_file),
+                            code=[process_data, load_datasets, storage, fetcher, trends, artifact_store],
+                            config={**config_values('TREND_START_DATE', 'TREND_END_DATE', 'TRENDS_RETRIEVE_API', *DATA_CONFIG),
+                                    'trend_files': TREND_FILES.get(keyword, TREND_FILES['JPMorgan Chase'])}))
+
+    stages.append(Stage("all_trends", build_all_trends,
+                        deps=[trend_stage_name(keyword) for keyword in TEAM_AND_SPONSORS],
+                        outputs=[table_path(ALL_TRENDS_CSV)],
+                        load=lambda: read_table(ALL_TRENDS_CSV),
+                        code=[build_all_trends, TrendsTable, storage],
+                        config=config_values('TEAM_AND_SPONSORS', *DATA_CONFIG)))
 
     # --- All GSW Data ---
-    all_df = combine_all_data(stats_df,articles_df,f'{CLEANED_DATA_DIR}/{ALL_TRENDS_CSV}')
-    if all_df is not None:
-        print(f"\nGolden State Warriors Combined and Cleaned Data Head:\n{all_df.head()}")
-    plot_all_data(all_df,result_dir=ALL_RESULTS_DIR)
\ No newline at end of file
+    stages.append(Stage("combine",
+                        lambda result: print_head("Golden State Warriors Combined and Cleaned Data",
+                                                  combine_all_data(result("stats"), result("articles"), table_path(ALL_TRENDS_CSV))),
+                        deps=["articles", "stats", "all_trends"],
+                        outputs=[dataset_path(ALL_DATA_DATASET)],
+                        load=load_all_data,
+                        code=[combine_all_data, process_data.season_column, process_data.count_column, storage], executor="process",
+                        config=config_values('SEASON_TIME_RANGES', 'SPONSOR_REGISTRY', 'ALL_DATA_DATASET', *DATA_CONFIG)))
+
+    # --- Correlations ---
+    stages.append(Stage("correlations", lambda result: build_correlations(result("combine"), correlation_columns()),
+                        deps=["combine"],
+                        outputs=[table_path(CORRELATIONS_TABLE, storage_format="parquet")],
+                        load=load_correlations,
+                        code=[correlations, storage],
+                        config={**config_values('SEASON_TIME_RANGES', 'CORRELATIONS_TABLE', 'EXPORT_CSV'), 'columns': correlation_columns()}))
+
+    # --- Plots ---
+    # plot stages only hash their own plot function, the job builders and the renderer, so editing one plot leaves data and other plots cached,
+    # and run in threads since each one draws its figures in a pool of render processes
+    stages.append(Stage("plot_articles", lambda result: plot_articles(result("articles"), result_dir=ARTICLES_RESULTS_DIR),
+                        deps=["articles"],
+                        outputs=plot_paths(ARTICLES_RESULTS_DIR, ALL_ARTICLES_PLOT, SEASON_ARTICLES_PLOT),
+                        code=[plot_articles, time_series_job, render],
+                        config=config_values('ALL_ARTICLES_PLOT', 'SEASON_ARTICLES_PLOT', *PLOT_CONFIG)))
+
+    stages.append(Stage("plot_stats", lambda result: plot_gsw_stats(result("stats"), result_dir=STATS_RESULTS_DIR),
+                        deps=["stats"],
+                        outputs=plot_paths(STATS_RESULTS_DIR, ALL_STATS_PLOT, SEASON_STATS_PLOT),
+                        code=[plot_gsw_stats, time_series_job, render],
+                        config=config_values('ALL_STATS_PLOT', 'SEASON_STATS_PLOT', *PLOT_CONFIG)))
+
+    stages.append(Stage("plot_trends", lambda result: plot_all_trends(table_path(ALL_TRENDS_CSV), result_dir=TRENDS_RESULTS_DIR),
+                        deps=["all_trends"],
+                        outputs=plot_paths(TRENDS_RESULTS_DIR, ALL_TRENDS_PLOT, ALL_SEASON_TRENDS_PLOT),
+                        code=[plot_all_trends, time_series_job, render],
+                        config=config_values('ALL_TRENDS_PLOT', 'ALL_SEASON_TRENDS_PLOT', 'TEAM_AND_SPONSORS', *PLOT_CONFIG)))
+
+    stages.append(Stage("plot_all_data", lambda result: plot_all_data(result("combine"), result_dir=ALL_RESULTS_DIR, correlations=result("correlations")),
+                        deps=["combine", "correlations"],
+                        outputs=plot_paths(ALL_RESULTS_DIR, ALL_DATA_PLOT, ALL_SEASON_DATA_PLOT, ALL_DATA_MATRIX,
+                                           ADJUSTED_ALL_DATA_MATRIX, CURRY_MATRIX, ADJUSTED_CURRY_MATRIX, CURRY_WIN_MATRIX,
+                                           ADJUSTED_CURRY_WIN_MATRIX, SPONSOR_MATRIX, ADJUSTED_SPONSOR_MATRIX),
+                        code=[plot_all_data, time_series_job, heatmap_job, render],
+                        config={**config_values('ALL_DATA_PLOT', 'ALL_SEASON_DATA_PLOT', 'FORMATTED_SPONSORS', *PLOT_CONFIG),
+                                'correlation_matrices': CORRELATION_MATRICES}))
+
+    return stages
+
+if __name__ == "__main__":
+    stages = build_stages()
+    arg_parser = argparse.ArgumentParser(description="Retrieve, clean and plot GSW data, skipping stages whose inputs did not change")
+    arg_parser.add_argument("--force", action="append", default=[], metavar="STAGE",
+                            help=f"run a stage even if cached, repeatable, 'all' or 'trends' for every keyword, 'trends_api' to retrieve trends again when TRENDS_RETRIEVE_API is set; stages: {', '.join(stage.name for stage in stages)}")
+    arg_parser.add_argument("--workers", type=int, default=PIPELINE_WORKERS, help="max stages running at once")
+    arg_parser.add_argument("--keep-going", action="store_true", help="keep running stages that do not depend on a failed stage")
+    args = arg_parser.parse_args()
+
+    # Create a data directory
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    status = Pipeline(stages, build_stages=build_stages).run(force=args.force, workers=args.workers, fail_fast=not args.keep_going)
+    print("\n".join(f"{name}: {stage_status}" for name, stage_status in status.items()))
@@ -0,0 +1,390 @@
+import hashlib
+import inspect
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import redirect_stdout, redirect_stderr
+
+import config
+from artifact_store import file_sha256
+from config import PIPELINE_CACHE_JSON, PIPELINE_WORKERS, PIPELINE_LOG_DIR
+
+# statuses of stages that did not finish, stages depending on them cannot run
+UNFINISHED = ("failed", "blocked", "cancelled")
+
+
+def config_values(*names):
+    """
+    :param names: names of config settings
+    :return: dictionary of setting name to value, used to fingerprint a stage
+    """
+    return {name: getattr(config, name) for name in names}
+
+def code_sha256(obj):
+    """
+    :param obj: module, class or function a stage runs
+    :return: hex sha256 of its source code
+    """
+    if inspect.ismodule(obj):
+        return file_sha256(inspect.getfile(obj))
+    return hashlib.sha256(inspect.getsource(obj).encode("utf-8")).hexdigest()
+
+def run_in_process(build_stages, name, log_path):
+    """
+    Runs a stage in a worker process. The stage is rebuilt from build_stages since stage functions
+    cannot be pickled, and results of dependencies are loaded from their saved outputs.
+
+    :param build_stages: module level function returning the list of pipeline stages
+    :param name: stage name
+    :param log_path: path of log file everything printed by the stage is written to
+    :return: True if the stage returned a result
+    """
+    stages = {stage.name: stage for stage in build_stages()}
+    results = {}
+
+    def result(dep):
+        if dep not in results:
+            results[dep] = stages[dep].load() if stages[dep].load else None
+        return results[dep]
+
+    with open(log_path, "w", encoding="utf-8") as log, redirect_stdout(log), redirect_stderr(log):
+        return stages[name].run(result) is not None
+
+
+def inherit_stage_output():
+    """
+    Lets threads started by a stage print to the stage's log, e.g. the workers of a thread pool.
+
+    :return: function to pass as initializer of a ThreadPoolExecutor, making its threads print where the calling thread prints
+    """
+    output = sys.stdout
+    log = getattr(output.local, "log", None) if isinstance(output, StageOutput) else None
+
+    def initializer():
+        if log is not None:
+            output.local.log = log
+
+    return initializer
+
+
+class StageOutput:
+    """
+    Stand-in for sys.stdout while stages run in threads. Text printed by a stage thread goes to
+    that stage's log file and everything else to the original stream, so the output of stages
+    running at once does not interleave. Thread pools started by a stage print to its log when
+    created with inherit_stage_output as initializer.
+    """
+
+    def __init__(self, stream):
+        """
+        :param stream: original sys.stdout
+        """
+        self.stream = stream
+        self.local = threading.local()
+
+    def target(self):
+        return getattr(self.local, "log", None) or self.stream
+
+    def write(self, text):
+        return self.target().write(text)
+
+    def flush(self):
+        self.target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class Stage:
+    """
+    One step of the pipeline: a function run with the results of the stages it depends on,
+    the files it writes and everything that decides what it writes.
+    """
+
+    def __init__(self, name, run, **kwargs):
+        """
+        :param name: stage name, used with --force
+        :param run: function taking a function that returns the result of a dependency by name
+        :param deps: names of stages whose results and outputs are used
+        :param outputs: paths of files written by the stage
+        :param load: function returning the result from the written outputs when the stage is skipped,
+                     stages with a load function fail when run returns None
+        :param code: modules, classes and functions whose source decides the outputs
+        :param config: dictionary of config settings and other values that decide the outputs
+        :param inputs: paths of raw files read by the stage that no other stage writes
+        :param executor: "thread" for stages mostly waiting on the network or disk, "process" for CPU-bound stages
+        :param refresh: function taking the same argument as run, called in a thread instead of skipping the stage
+                        when it is up to date, e.g. to add new data from a source to the saved outputs
+        """
+        self.name = name
+        self.run = run
+        self.deps = list(kwargs.get("deps", []))
+        self.outputs = list(kwargs.get("outputs", []))
+        self.load = kwargs.get("load")
+        self.code = list(kwargs.get("code", []))
+        self.config = kwargs.get("config", {})
+        self.inputs = list(kwargs.get("inputs", []))
+        self.executor = kwargs.get("executor", "thread")
+        self.refresh = kwargs.get("refresh")
+
+
+class Pipeline:
+    """
+    Runs stages in dependency order and skips every stage whose fingerprint matches its last
+    successful run. A fingerprint hashes the stage's code, config values, raw input files and
+    the contents of the outputs of the stages it depends on, so a stage only runs again when
+    something it reads changed, and stages after it only run again if its outputs changed.
+    Up to date stages with a refresh function call it instead of being skipped.
+    Stages whose dependencies have finished run at the same time, in a thread or a worker
+    process depending on their executor, each printing to its own log file.
+    """
+
+    def __init__(self, stages, cache_path=PIPELINE_CACHE_JSON, **kwargs):
+        """
+        :param stages: list of Stage, every stage listed after the stages it depends on
+        :param cache_path: path of JSON file recording the fingerprint and outputs of each finished stage
+        :param build_stages: module level function returning the same stages, needed to run stages in
+                             worker processes, process stages run in threads if not given
+        :param log_dir: directory of stage log files
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_path = cache_path
+        self.build_stages = kwargs.get("build_stages")
+        self.log_dir = kwargs.get("log_dir", PIPELINE_LOG_DIR)
+        self.results = {}
+        self.status = {}
+        self._hashes = {}
+        self._lock = threading.Lock()
+
+        for stage in stages:
+            for dep in stage.deps:
+                if dep not in self.stages or list(self.stages).index(dep) > list(self.stages).index(stage.name):
+                    raise ValueError(f"Stage {stage.name} depends on {dep}, which is not listed before it")
+
+        try:
+            with open(cache_path, encoding="utf-8") as file:
+                self.cache = json.load(file)
+        except (OSError, ValueError):
+            self.cache = {}
+
+    def output_sha256(self, path):
+        """
+        :param path: path of file or directory, e.g. a partitioned dataset
+        :return: hex sha256 of file contents or None if missing, reused while size and modification time are unchanged
+        """
+        if not os.path.exists(path):
+            return None
+        if os.path.isdir(path):
+            # hash of the relative path and contents of every file inside the directory
+            digest = hashlib.sha256()
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for file in sorted(files):
+                    file_path = os.path.join(root, file)
+                    digest.update(f"{os.path.relpath(file_path, path)}:{self.output_sha256(file_path)}\n".encode("utf-8"))
+            return digest.hexdigest()
+        stat = os.stat(path)
+        key = (path, stat.st_size, stat.st_mtime_ns)
+        if key not in self._hashes:
+            self._hashes[key] = file_sha256(path)
+        return self._hashes[key]
+
+    def fingerprint(self, stage):
+        """
+        :param stage: Stage
+        :return: hex sha256 of everything that decides the outputs of stage
+        """
+        parts = {
+            "code": [code_sha256(obj) for obj in stage.code],
+            "config": stage.config,
+            "inputs": {path: self.output_sha256(path) for path in stage.inputs},
+            "deps": {dep: {path: self.output_sha256(path) for path in self.stages[dep].outputs} for dep in stage.deps},
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def is_cached(self, stage, fingerprint):
+        """
+        :param stage: Stage
+        :param fingerprint: current fingerprint of stage
+        :return: True if the last run had the same fingerprint and its outputs are unchanged
+        """
+        entry = self.cache.get(stage.name)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return False
+        return all(self.output_sha256(path) == entry["outputs"].get(path) for path in stage.outputs)
+
+    def result(self, name):
+        """
+        :param name: stage name
+        :return: result of stage, loaded from its outputs the first time it is needed if the stage did not run in this thread
+        """
+        with self._lock:
+            if name not in self.results:
+                stage = self.stages[name]
+                self.results[name] = stage.load() if stage.load else None
+            return self.results[name]
+
+    def save_cache(self):
+        tmp_path = f"{self.cache_path}.tmp"
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.cache, file, indent=4)
+        os.replace(tmp_path, self.cache_path)
+
+    def forced(self, stage, force):
+        """
+        :param stage: Stage
+        :param force: stage names to run regardless of the cache, "all" for every stage, or a
+                      group such as "trends" for every stage named "trends:<keyword>"
+        :return: True if stage is forced
+        """
+        return "all" in force or stage.name in force or stage.name.split(":")[0] in force
+
+    def log_path(self, stage):
+        return os.path.join(self.log_dir, f"{stage.name.replace(':', '_').replace(' ', '')}.log")
+
+    def run_in_thread(self, stage, output, refresh=False):
+        """
+        :param stage: Stage
+        :param output: StageOutput installed as sys.stdout
+        :param refresh: call the refresh function of stage instead of run
+        :return: True if the stage returned a result
+        """
+        with open(self.log_path(stage), "w", encoding="utf-8") as log:
+            output.local.log = log
+            try:
+                result = (stage.refresh if refresh else stage.run)(self.result)
+            finally:
+                output.local.log = None
+
+        with self._lock:
+            self.results[stage.name] = result
+        return result is not None
+
+    def finish(self, stage, fingerprint, start, returned, refresh=False):
+        """
+        Records a stage that ran and prints its log.
+
+        :param stage: Stage
+        :param fingerprint: fingerprint of stage when it was started
+        :param start: perf_counter time stage was started
+        :param returned: True if the stage returned a result, or the exception it raised
+        :param refresh: the refresh function of an up to date stage ran, which keeps the cached outputs if it fails
+        :return: "ran", "skipped" or "failed"
+        """
+        seconds = time.perf_counter() - start
+        status = "ran"
+        if isinstance(returned, Exception):
+            with open(self.log_path(stage), "a", encoding="utf-8") as log:
+                log.write(f"Error running {stage.name}: {returned}\n")
+            status = "failed"
+        elif stage.load is not None and not returned:
+            with open(self.log_path(stage), "a", encoding="utf-8") as log:
+                log.write(f"{stage.name} returned no data\n")
+            status = "failed"
+
+        if status == "failed" and refresh and self.is_cached(stage, fingerprint):
+            # outputs were left as they were, so stages after it can still use them
+            with open(self.log_path(stage), "a", encoding="utf-8") as log:
+                log.write(f"Refreshing {stage.name} failed, using cached outputs\n")
+            with self._lock:
+                self.results.pop(stage.name, None)
+            status = "skipped"
+        elif status == "ran":
+            self.cache[stage.name] = {
+                "fingerprint": fingerprint,
+                "outputs": {path: self.output_sha256(path) for path in stage.outputs},
+                "seconds": seconds,
+                "finished_at": time.time(),
+            }
+            self.save_cache()
+
+        # print the whole log of the stage at once so stages running at the same time do not interleave
+        with open(self.log_path(stage), encoding="utf-8") as log:
+            print(f"--- {stage.name}: {status} in {seconds:.1f}s ---\n{log.read()}")
+        print("=" * 50 + "\n")
+        return status
+
+    def run(self, force=(), workers=PIPELINE_WORKERS, fail_fast=True):
+        """
+        Runs every stage whose dependencies finished, up to workers stages at once.
+
+        :param force: stage names to run regardless of the cache
+        :param workers: max stages running at once
+        :param fail_fast: stop starting stages once one fails, otherwise only stages depending on it are left out
+        :return: dictionary of stage name to "ran", "skipped", "failed", "blocked" or "cancelled"
+        """
+        unknown = [name for name in force if name != "all" and not any(name in (stage, stage.split(":")[0]) for stage in self.stages)]
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(unknown)}")
+
+        os.makedirs(self.log_dir, exist_ok=True)
+        pending = list(self.stages.values())
+        running = {}
+        failed = False
+        threads = ThreadPoolExecutor(max_workers=workers)
+        processes = None
+        output = StageOutput(sys.stdout)
+        sys.stdout = output
+
+        try:
+            while pending or running:
+                # start every ready stage while there are free workers, cached stages finish right away
+                for stage in list(pending):
+                    if failed and fail_fast:
+                        self.status[stage.name] = "cancelled"
+                        pending.remove(stage)
+                        continue
+                    unfinished = [dep for dep in stage.deps if self.status.get(dep) in UNFINISHED]
+                    if unfinished:
+                        print(f"Skipping {stage.name}, {', '.join(unfinished)} did not finish")
+                        self.status[stage.name] = "blocked"
+                        pending.remove(stage)
+                        continue
+                    if any(dep not in self.status for dep in stage.deps):
+                        continue
+
+                    fingerprint = self.fingerprint(stage)
+                    refresh = not self.forced(stage, force) and self.is_cached(stage, fingerprint)
+                    if refresh and stage.refresh is None:
+                        print(f"{stage.name} is up to date, using cached outputs")
+                        self.status[stage.name] = "skipped"
+                        pending.remove(stage)
+                        continue
+                    if len(running) >= workers:
+                        continue
+
+                    if refresh:
+                        future = threads.submit(self.run_in_thread, stage, output, refresh=True)
+                    elif stage.executor == "process" and self.build_stages is not None:
+                        if processes is None:
+                            processes = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                        future = processes.submit(run_in_process, self.build_stages, stage.name, self.log_path(stage))
+                    else:
+                        future = threads.submit(self.run_in_thread, stage, output)
+                    running[future] = (stage, fingerprint, time.perf_counter(), refresh)
+                    pending.remove(stage)
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, fingerprint, start, refresh = running.pop(future)
+                    try:
+                        returned = future.result()
+                    except Exception as e:
+                        returned = e
+                    self.status[stage.name] = self.finish(stage, fingerprint, start, returned, refresh=refresh)
+                    failed = failed or self.status[stage.name] == "failed"
+        finally:
+            sys.stdout = output.stream
+            threads.shutdown(wait=True, cancel_futures=True)
+            if processes is not None:
+                processes.shutdown(wait=True, cancel_futures=True)
+
+        return {name: self.status[name] for name in self.stages}
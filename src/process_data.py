@@ -2,74 +2,130 @@ import re
 import os
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 
-from config import (CLEANED_DATA_DIR, RAW_DATA_DIR, SPONSORS, STATS_HTML, STATS_CSV, 
-                    CLEANED_STATS_CSV, ARTICLE_JSON, ARTICLE_CSV, CLEANED_ARTICLE_CSV, RAKUTEN_TREND_CSV, 
+from config import (RAW_DATA_DIR, SPONSORS, ARTICLE_STREAM_BATCH_SIZE, STATS_HTML, STATS_CSV, 
+                    CLEANED_STATS_CSV, ARTICLE_JSON, ARTICLE_CSV, CLEANED_ARTICLE_CSV, SPONSOR_MENTIONS_CSV, RAKUTEN_TREND_CSV, 
                     UNITED_TREND_CSV, CHASE_TREND_CSV, GSW_TREND_CSV, START_DATE, END_DATE, 
                     RAKUTEN_DRIVE_CSV,RAKUTEN_CLEANED_TREND_CSV,UNITED_CLEANED_TREND_CSV, UNITED_DRIVE_CSV,
                     CHASE_CLEANED_TREND_CSV, CHASE_DRIVE_CSV, GSW_CLEANED_TREND_CSV, GSW_DRIVE_CSV,
-                    TREND_START_DATE, TREND_END_DATE, SEASON_TIME_RANGES, SEASON_DATA_CSV,
-                    ALL_SEASONS_DATA_CSV, ALL_TRENDS_CSV)
-from load_datasets import get_gsw_game_stats_webscrape, get_gsw_articles_api, get_gsw_sponsor_trends,download_gdrive_file
+                    TREND_START_DATE, TREND_END_DATE, SEASON_TIME_RANGES,
+                    ALL_DATA_DATASET, ALL_TRENDS_CSV, SPONSOR_REGISTRY, TEAM_AND_SPONSORS)
+from sponsors import SponsorMatcher, count_column
+from storage import (STATS_SCHEMA, MENTIONS_SCHEMA, TRENDS_SCHEMA, ALL_DATA_SCHEMA, DATE,
+                     read_table, write_table, table_exists, write_partitioned, read_partitioned)
+from load_datasets import (get_gsw_game_stats_webscrape, get_gsw_articles_api, get_gsw_sponsor_trends, get_all_sponsor_trends, download_gdrive_file,
+                           iter_gsw_articles, ARTICLE_COLUMNS)
+from trends import load_cached_windows, rescale_daily
+
+# one pattern per raw ESPN column, each extracting every field derived from that column in a single pass
+# patterns are compiled once per column by Arrow's regex engine, optional groups that did not match extract as ''
+GAME_DATE_PATTERN = r'^\w+,\s+(?P<Month>[A-Za-z]{3})\s+(?P<Day>\d{1,2})$'
+OPPONENT_PATTERN = r'^(?:(?P<Home_Away>@|vs)\s+)?(?P<Opponent>.*)$'
+RESULT_PATTERN = r'^(?P<Outcome>[WL])\s*(?P<Winner_Score>\d+)-(?P<Loser_Score>\d+)(?:\s*(?P<Overtime>\d*OT))?$'
+RECORD_PATTERN = r'^(?P<Wins>\d+)-(?P<Losses>\d+)$'
+HI_PATTERN = r'^(?P<Player>.*?)\s+(?P<Value>\d+)$'
+
+MONTHS = {month: number for number, month in enumerate(['Jan','Feb','Mar','Apr','May','Jun','Jul','Aug','Sep','Oct','Nov','Dec'], start=1)}
+HOME_AWAY = {'@': 'away', 'vs': 'home'}
+
+def extract_fields(column: pd.Series, pattern: str) -> pd.DataFrame:
+    """
+    :param column: raw text column
+    :param pattern: regex with one named group per derived field
+    :return: DataFrame with one column per named group, using Arrow's vectorized regex extraction
+    """
+    return column.astype(pd.ArrowDtype(pa.string())).str.extract(pattern)
+
+def to_category(column: pd.Series) -> pd.Series:
+    """
+    :param column: extracted text column
+    :return: categorical column with plain string categories
+    """
+    return column.astype(object).astype('category')
+
+def clean_game_stats(stats_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Transforms raw ESPN schedule rows into typed game stats, with categorical names and small integer values.
+
+    :param stats_df: raw game stats DataFrame with Season, Date, Opponent, Result, Record and Hi columns
+    :return: Pandas DataFrame of cleaned game stats
+    """
+    stats_df = stats_df.reset_index(drop=True)
+    season = stats_df['Season'].astype('int16').to_numpy()
+
+    # games from September to December are played in the year before the season year
+    date = extract_fields(stats_df['Date'], GAME_DATE_PATTERN)
+    month = date['Month'].str.title().map(MONTHS).to_numpy(dtype='int64')
+    game_date = pd.to_datetime(pd.DataFrame({'year': season - (month >= 9), 'month': month, 'day': date['Day'].astype('int64')}))
+
+    # opponent name and home/away from the '@ ' or 'vs ' prefix
+    opponent = extract_fields(stats_df['Opponent'], OPPONENT_PATTERN)
+    home_away = opponent['Home_Away'].astype(object).map(HOME_AWAY).fillna('unknown')
+
+    # win/loss, overtime, winner and loser scores from the result, wins and losses from the record
+    result = extract_fields(stats_df['Result'], RESULT_PATTERN)
+    record = extract_fields(stats_df['Record'], RECORD_PATTERN)
+    win = (result['Outcome'] == 'W').to_numpy(dtype=bool)
+    winner_score = result['Winner_Score'].astype('int16').to_numpy()
+    loser_score = result['Loser_Score'].astype('int16').to_numpy()
+
+    cleaned_df = pd.DataFrame({
+        'Season': season,
+        'Date': game_date,
+        'Opponent': to_category(opponent['Opponent']),
+        'Home_Away': home_away.astype('category'),
+        'Win': win.astype('int8'),
+        'Overtime': result['Overtime'].fillna('').ne('').to_numpy(dtype='int8'),
+        'Wins': record['Wins'].astype('int16').to_numpy(),
+        'Losses': record['Losses'].astype('int16').to_numpy(),
+        'Team_Score': np.where(win, winner_score, loser_score),
+        'Opp_Score': np.where(win, loser_score, winner_score),
+        'Abs_Point_Difference': winner_score - loser_score,
+    })
+
+    # split hi player/values into separate columns
+    for stat in ['Points', 'Rebounds', 'Assists']:
+        hi = extract_fields(stats_df[f'Hi {stat}'], HI_PATTERN)
+        cleaned_df[f'Hi_{stat}_Player'] = to_category(hi['Player'])
+        cleaned_df[f'Hi_{stat}_Value'] = hi['Value'].astype('int16').to_numpy()
+
+    return cleaned_df
 
-def process_game_data(url: str) -> pd.DataFrame:
+def process_game_data(url: str, replay=False) -> pd.DataFrame:
     """
-    Cleans and transforms loaded GSW statistics from ESPN tables, saves the cleaned data to CSV,
+    Cleans and transforms loaded GSW statistics from ESPN tables, saves the cleaned data,
     and loads the data to a pandas DataFrame. 
 
     :param url: base webscrape URL to request data from ESPN website
+    :param replay: rebuild raw data from pages captured by an earlier run instead of the website
     :return: Pandas DataFrame or None
     """
     # retrieve data from webscrape
-    stats_df = get_gsw_game_stats_webscrape(url,STATS_HTML,STATS_CSV,extract_dir = RAW_DATA_DIR)
-
-    # path to place files into data folder
-    cleaned_csv_path = os.path.join(CLEANED_DATA_DIR, CLEANED_STATS_CSV)
-    os.makedirs(os.path.dirname(cleaned_csv_path), exist_ok=True)
-
-    # transform date column to fit datetime format
-    before_new_year = stats_df['Date'].str.contains(r'Sep|Oct|Nov|Dec')
-    stats_df['Year'] =  stats_df['Season'].astype(int)
-    stats_df.loc[before_new_year,'Year'] = stats_df['Season'].astype(int) - 1
-    stats_df['Date'] = pd.to_datetime(stats_df['Date'] + ' ' + stats_df['Year'].astype(str),format="%a, %b %d %Y")
-
-    # create new column to designate home/away games based on Opponent Column
-    # remove '@ ' and 'vs ' from Opponent Column
-    stats_df['Home_Away'] = np.where(stats_df['Opponent'].str.startswith('@ '),'away', np.where(stats_df['Opponent'].str.startswith('vs '),'home', 'unknown'))
-    stats_df['Opponent'] = stats_df['Opponent'].replace(r'^(?:@ |vs )', '', regex=True)
-
-    # create new column to designate wins/losses, if overtime
-    # split scores by GSW and Opponent into separate columns, and find absolute point difference
-    stats_df['Win'] = np.where(stats_df['Result'].str.startswith('W'), 1, 0)
-    stats_df['Overtime'] = np.where(stats_df['Result'].str.endswith('OT'), 1, 0)
-    stats_df['Result'] = stats_df['Result'].str.replace(r'\s\d*OT$', '', regex=True)
-    stats_df[['Wins', 'Losses']] = stats_df['Record'].str.split('-', expand=True).astype(int)
-    stats_df[['Winner_Score', 'Loser_Score']] = stats_df['Result'].str[2:].str.split('-', expand=True).astype(int)
-    stats_df['Team_Score'] = np.where(stats_df['Win'] == 1, stats_df['Winner_Score'], stats_df['Loser_Score'])
-    stats_df['Opp_Score'] = np.where(stats_df['Win'] == 1, stats_df['Loser_Score'], stats_df['Winner_Score'])
-    stats_df['Abs_Point_Difference'] = stats_df['Winner_Score'] - stats_df['Loser_Score']
-
-    # split hi player/values into separate columns
-    stats_df[['Hi_Points_Player', 'Hi_Points_Value']] = stats_df['Hi Points'].str.rsplit(' ', n=1, expand=True)
-    stats_df[['Hi_Rebounds_Player', 'Hi_Rebounds_Value']] = stats_df['Hi Rebounds'].str.rsplit(' ', n=1, expand=True)
-    stats_df[['Hi_Assists_Player', 'Hi_Assists_Value']] = stats_df['Hi Assists'].str.rsplit(' ', n=1, expand=True)
-    stats_df['Hi_Points_Value'] = stats_df['Hi_Points_Value'].astype(int)
-    stats_df['Hi_Rebounds_Value'] = stats_df['Hi_Rebounds_Value'].astype(int)
-    stats_df['Hi_Assists_Value'] = stats_df['Hi_Assists_Value'].astype(int)
+    stats_df = get_gsw_game_stats_webscrape(url,STATS_HTML,STATS_CSV,extract_dir = RAW_DATA_DIR,replay=replay)
+    if stats_df is None:
+        return None
 
-    # drop irrelevant columns
-    stats_df = stats_df.drop(columns=['Hi Points', 'Hi Rebounds', 'Hi Assists', 'Result', 'Record','Year','Winner_Score', 'Loser_Score'])
+    stats_df = clean_game_stats(stats_df)
 
     try:  
-        # save cleaned data to csv
-        stats_df.to_csv(cleaned_csv_path, index=False)
-
-        return stats_df
+        # save cleaned data with typed columns
+        return write_table(stats_df, CLEANED_STATS_CSV, STATS_SCHEMA)
     # return exception if error occurs
     except Exception as e:
-        print(f"Error saving GSW stats data to CSV file: {e}")
+        print(f"Error saving GSW stats data: {e}")
         return None
 
+# phrases that introduce a sponsor, the sponsor name ends at punctuation, end of sentence, or preposition
+SPONSOR_PHRASE_PATTERN = r'(?:presented by|powered by|(?:in )?partnership with)\s+(?P<sponsor>.*?)(?: for | in | at | on |,|\.|;|$)'
+# sponsor phrases and aliases of registry sponsors, found together in one scan of a text column
+SPONSOR_MATCHER = SponsorMatcher(SPONSOR_REGISTRY, phrase_pattern=SPONSOR_PHRASE_PATTERN)
+
+# columns of the long-format sponsor mention table, one row per sponsor phrase found in an article
+MENTION_COLUMNS = ['Date', 'article_id', 'sponsor', 'is_major']
+# daily article columns derived from the mention table
+MENTION_COUNT_COLUMNS = ['Total_Sponsor_Count', 'Major_Sponsor_Count', 'Other_Sponsor_Count']
+
 def extract_sponsors(text):
     """
     Finds all sponsors with a cell and returns them to a list.
@@ -78,155 +134,387 @@ def extract_sponsors(text):
     :return: list of sponsors or empty list
     """
     # filter sponsors and stop after reaching punctuation, end of sentence, or preposition
-    sponsors = re.findall(r'(?:presented by|powered by|(?:in )?partnership with)\s+(.*?)(?: for | in | at | on |,|\.|;|$)', text, flags=re.IGNORECASE)
+    sponsors = re.findall(SPONSOR_PHRASE_PATTERN, text, flags=re.IGNORECASE)
 
     return [sponsor.strip() for sponsor in sponsors]
-  
-def process_article_data(url: str) -> pd.DataFrame:
+
+def extract_sponsor_mentions(articles_df: pd.DataFrame, matcher=SPONSOR_MATCHER) -> pd.DataFrame:
     """
-    Cleans and transforms loaded articles from GSW news website, saves the cleaned data to CSV,
-    and loads the data to a pandas DataFrame. 
+    Scans the Title and Excerpt columns once each with the matcher's scan pattern and returns every match
+    in text order, one row per match.
 
-    :param url: base API URL to request data from GSW news website
-    :return: Pandas DataFrame or None
+    :param articles_df: articles DataFrame with Title and Excerpt columns
+    :param matcher: SponsorMatcher built with SPONSOR_PHRASE_PATTERN
+    :return: DataFrame with article position, sponsor (from a sponsor phrase) and name (registry sponsor alias) columns
     """
-    # retrieve data from API
-    articles_df = get_gsw_articles_api(url,ARTICLE_JSON,ARTICLE_CSV,extract_dir = RAW_DATA_DIR)
+    matches = []
+    for source, column in enumerate(['Title', 'Excerpt']):
+        found = articles_df[column].fillna('').reset_index(drop=True).str.extractall(matcher.scan_pattern).rename_axis(['article', 'match'])
+        matches.append(found.assign(source=source).reset_index())
+
+    # order matches as they appear in the title followed by the excerpt, a match without a tracked name is a sponsor phrase
+    mentions = pd.concat(matches, ignore_index=True).sort_values(['article', 'source', 'match'], kind='stable')
+    mentions['sponsor'] = mentions['sponsor'].where(mentions['name'].notna(), mentions['sponsor'].fillna('').str.strip())
+
+    return mentions[['article', 'sponsor', 'name']]
 
-    # path to place files into data folder
-    cleaned_csv_path = os.path.join(CLEANED_DATA_DIR, CLEANED_ARTICLE_CSV)
-    os.makedirs(os.path.dirname(cleaned_csv_path), exist_ok=True)
+def article_ids(urls: pd.Series) -> pd.Series:
+    """
+    :param urls: article Url column
+    :return: stable unsigned 64-bit ID of each article, the same across runs for the same Url
+    """
+    return pd.util.hash_pandas_object(urls.fillna(''), index=False)
+
+def add_sponsor_columns(articles_df: pd.DataFrame, matcher=SPONSOR_MATCHER) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Adds per-sponsor mention counts for every registry sponsor to each article and builds the
+    sponsor mention table, both derived from a single extract_sponsor_mentions scan.
+
+    :param articles_df: articles DataFrame with Date, article_id, Title and Excerpt columns
+    :param matcher: SponsorMatcher built with SPONSOR_PHRASE_PATTERN
+    :return: tuple of articles DataFrame with sponsor count columns added and sponsor mention DataFrame
+    """
+    mentions = extract_sponsor_mentions(articles_df, matcher)
+    phrases = mentions[mentions['name'].isna()]
+    names = mentions[mentions['name'].notna()]
+
+    # count registry sponsor mentions, including aliases that appear inside a sponsor phrase
+    in_phrases = matcher.find(phrases['sponsor'])
+    counts = matcher.count_columns(
+        np.concatenate([names['article'].to_numpy(dtype='int64'), phrases['article'][in_phrases.index].to_numpy(dtype='int64')]),
+        pd.concat([names['name'], in_phrases]), articles_df.index)
+    articles_df = pd.concat([articles_df, counts], axis=1)
+
+    # create long-format table of sponsor phrases with sponsor names stored as categorical codes
+    positions = phrases['article'].to_numpy(dtype='int64')
+    mentions_df = pd.DataFrame({
+        'Date': articles_df['Date'].to_numpy()[positions],
+        'article_id': articles_df['article_id'].to_numpy()[positions],
+        'sponsor': pd.Categorical(phrases['sponsor'].to_numpy()),
+        'is_major': phrases['sponsor'].isin(SPONSORS).to_numpy(),
+    })
+
+    return articles_df, mentions_df
+
+def clean_articles(articles_df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Cleans loaded articles from GSW news website, adds sponsor count columns to each article
+    and extracts the sponsor mention table.
+
+    :param articles_df: raw articles DataFrame
+    :return: tuple of Pandas DataFrames of articles and sponsor mentions within season time range
+    """
+    # drop articles that appear more than once because the feed shifted while paging
+    articles_df = articles_df[~(articles_df['Url'].duplicated() & articles_df['Url'].notna())].copy()
 
     # convert date column to datetime then update time range to beginning of 2021 season to end of 2025 season
-    articles_df['Date'] = pd.to_datetime(articles_df['Date']).dt.tz_convert(None).dt.normalize()
+    articles_df['Date'] = pd.to_datetime(articles_df['Date'], utc=True).dt.tz_convert(None).dt.normalize()
     start_date = pd.to_datetime(START_DATE)
     end_date   = pd.to_datetime(END_DATE)
-    articles_df = articles_df[(articles_df['Date'] >= start_date) & (articles_df['Date'] <= end_date)]
+    articles_df = articles_df[(articles_df['Date'] >= start_date) & (articles_df['Date'] <= end_date)].copy()
+    articles_df['article_id'] = article_ids(articles_df['Url'])
 
-    # create for loop to transform sponsor data
-    for sponsor in SPONSORS:
-        # create column for count if sponsor is mentioned in article
-        sponsor_no_spaces = sponsor.replace(" ","")
-        articles_df[f'{sponsor_no_spaces}_Count'] = articles_df['Title'].str.count(sponsor, flags=re.IGNORECASE) + articles_df['Excerpt'].str.count(sponsor, flags=re.IGNORECASE)
-    
-    # create columns for list of sponsors mentioned in article, if they are major or other sponsors, and total sponsor count
-    articles_df['Sponsors_List'] = articles_df.apply(lambda row: list(dict.fromkeys(extract_sponsors(row['Title']) + extract_sponsors(row['Excerpt']))),axis=1)
-    articles_df['Major_Sponsor'] = articles_df['Sponsors_List'].apply(lambda sponsor_list: [s for s in sponsor_list if s in SPONSORS])
-    articles_df['Other_Sponsor'] = articles_df['Sponsors_List'].apply(lambda sponsor_list: [s for s in sponsor_list if s not in SPONSORS])
-    articles_df['Total_Sponsor_Count'] = articles_df.apply(lambda row:len(extract_sponsors(row['Title']) + extract_sponsors(row['Excerpt'])),axis=1)
+    # add sponsor counts and mentions from one scan of the title and excerpt
+    articles_df, mentions_df = add_sponsor_columns(articles_df)
 
     # remove url and author columns
-    articles_df = articles_df.drop(columns=['Url','Author'])
+    return articles_df.drop(columns=['Url','Author']), mentions_df
+
+def daily_mention_counts(mentions_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Counts sponsor phrases on each day, and distinct major and other sponsors per article summed over each day.
+
+    :param mentions_df: sponsor mention DataFrame
+    :return: Pandas DataFrame indexed by Date with Total_Sponsor_Count, Major_Sponsor_Count and Other_Sponsor_Count columns
+    """
+    total = mentions_df.groupby('Date').size().rename('Total_Sponsor_Count')
+
+    # an article naming the same sponsor twice counts that sponsor once
+    distinct = mentions_df.drop_duplicates(['article_id', 'sponsor'])
+    by_type = (distinct.groupby(['Date', 'is_major']).size()
+               .unstack('is_major').reindex(columns=[True, False], fill_value=0)
+               .rename(columns={True: 'Major_Sponsor_Count', False: 'Other_Sponsor_Count'}))
 
+    return pd.concat([total, by_type], axis=1).rename_axis(columns=None)
+
+def aggregate_daily_articles(articles_df: pd.DataFrame, mentions_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sums cleaned article columns and sponsor mentions for all articles on each day of the season time range.
+
+    :param articles_df: cleaned articles DataFrame
+    :param mentions_df: sponsor mention DataFrame of the same articles
+    :return: Pandas DataFrame with one row per day
+    """
     # create df with sum of columns for all articles on each day
     daily_article_df = (articles_df.groupby('Date').agg({
         'Title': 'count',
-        'Sponsors_List':'sum',
-        'Total_Sponsor_Count': 'sum',
-        'Major_Sponsor': 'sum',
-        'Other_Sponsor': 'sum',
-        'Rakuten_Count': 'sum',
-        'UnitedAirlines_Count': 'sum',
-        'Chase_Count':'sum'}
-    ).rename(columns={'Title': 'Article_Count'})
-    .reset_index())
+        **{column: 'sum' for column in SPONSOR_MATCHER.columns}}
+    ).rename(columns={'Title': 'Article_Count'}))
+    daily_article_df = daily_article_df.join(daily_mention_counts(mentions_df)).reset_index()
 
     # add date column to daily df
     full_date_range = pd.DataFrame({"Date": pd.date_range(start=START_DATE, end=END_DATE)})
     daily_article_df = full_date_range.merge(daily_article_df, on="Date", how="left")
-    
+
     # if cell value is empty, fill with 0
-    daily_article_df = daily_article_df.fillna({
-        'Article_Count': 0,
-        'Sponsors_List':0,
-        'Total_Sponsor_Count': 0,
-        'Major_Sponsor': 0,
-        'Other_Sponsor': 0,
-        'Rakuten_Count': 0,
-        'UnitedAirlines_Count': 0,
-        'Chase_Count':0})
+    count_columns = ['Article_Count'] + MENTION_COUNT_COLUMNS + SPONSOR_MATCHER.columns
+    return daily_article_df[['Date'] + count_columns].fillna(0).astype({column: 'int64' for column in count_columns})
 
-    try:  
-        # save cleaned data to csv
-        daily_article_df.to_csv(cleaned_csv_path, index=False)
+def merge_daily_articles(daily_article_df: pd.DataFrame, new_daily_article_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds daily sums of newly ingested articles to a previously cleaned daily articles DataFrame.
+
+    :param daily_article_df: previously cleaned daily articles DataFrame
+    :param new_daily_article_df: daily articles DataFrame of new articles only
+    :return: Pandas DataFrame with one row per day
+    """
+    merged_df = daily_article_df.set_index('Date')
+    new_df = new_daily_article_df.set_index('Date').reindex(index=merged_df.index, columns=merged_df.columns)
+
+    # every daily column is a count, so new counts add up
+    return merged_df.add(new_df, fill_value=0).astype(merged_df.dtypes.to_dict()).reset_index()
+
+class DailyArticleCounts:
+    """
+    Running daily article and sponsor counts from START_DATE to END_DATE. Batches of raw articles
+    are cleaned and added one at a time, so only the daily table is ever held in full.
+    """
+
+    def __init__(self):
+        self.daily_df = aggregate_daily_articles(*clean_articles(pd.DataFrame(columns=ARTICLE_COLUMNS)))
+        self.count_columns = list(self.daily_df.columns[1:])
+        self.counts = self.daily_df[self.count_columns].to_numpy()
+        self.articles = 0
+
+    def add(self, articles_df):
+        """
+        :param articles_df: raw articles DataFrame of one batch
+        """
+        daily_article_df = aggregate_daily_articles(*clean_articles(articles_df))
+        self.counts += daily_article_df[self.count_columns].to_numpy()
+        self.articles += len(articles_df)
+
+    def to_frame(self):
+        """
+        :return: Pandas DataFrame with one row per day, like aggregate_daily_articles
+        """
+        return self.daily_df[['Date']].assign(**dict(zip(self.count_columns, self.counts.T)))
+
+def stream_article_data(url: str, batch_size=ARTICLE_STREAM_BATCH_SIZE, **kwargs) -> pd.DataFrame:
+    """
+    Streams articles from a news API with the GSW News API format and folds them into daily counts
+    in batches as pages arrive. Neither the raw articles nor the sponsor mention table are kept, so
+    memory stays the same however many articles or feeds are read.
+
+    :param url: base API URL to request data from
+    :param batch_size: number of articles cleaned at once
+    :param workers: max number of pages requested at once
+    :param fetcher: Fetcher to send requests with, one is created if not given
+    :return: Pandas DataFrame of daily counts
+    """
+    daily_counts = DailyArticleCounts()
+    batch = []
+    for rows in iter_gsw_articles(url, extract_dir=RAW_DATA_DIR, **kwargs):
+        batch.extend(rows)
+        if len(batch) >= batch_size:
+            daily_counts.add(pd.DataFrame(batch, columns=ARTICLE_COLUMNS))
+            batch = []
+    if batch:
+        daily_counts.add(pd.DataFrame(batch, columns=ARTICLE_COLUMNS))
+
+    print(f"streamed {daily_counts.articles} articles")
+    return daily_counts.to_frame()
+
+def process_article_data(url: str, incremental=False, replay=False, stream=False, reclean=False) -> pd.DataFrame:
+    """
+    Cleans and transforms loaded articles from GSW news website, saves the cleaned daily data and the
+    sponsor mention table, and loads the daily data to a pandas DataFrame.
+
+    :param url: base API URL to request data from GSW news website
+    :param incremental: only retrieve and clean articles newer than the last run, adding them to the cleaned data
+    :param replay: rebuild raw data from pages captured by an earlier run instead of the API
+    :param stream: fold articles into the daily data in batches as pages arrive, keeping neither raw
+                   articles nor the sponsor mention table, see stream_article_data
+    :param reclean: after an incremental retrieval, clean every raw article again instead of adding the new ones
+                    to the cleaned data, e.g. when the cleaning code or settings changed
+    :return: Pandas DataFrame or None
+    """
+    if stream:
+        try:
+            return write_table(stream_article_data(url), CLEANED_ARTICLE_CSV, {'Date': DATE}, default='int32')
+        # return exception if error occurs
+        except Exception as e:
+            print(f"Error streaming GSW articles data: {e}")
+            return None
+
+    # retrieve data from API, incremental runs only return new articles
+    articles_df = get_gsw_articles_api(url,ARTICLE_JSON,ARTICLE_CSV,extract_dir = RAW_DATA_DIR,incremental=incremental,replay=replay)
+    incremental = incremental and not replay
+    if articles_df is None:
+        return None
 
-        return daily_article_df
+    if incremental and not reclean and table_exists(CLEANED_ARTICLE_CSV) and table_exists(SPONSOR_MENTIONS_CSV):
+        # clean new articles only and add their daily sums and mentions to the existing cleaned data
+        daily_article_df = read_table(CLEANED_ARTICLE_CSV)
+        mentions_df = read_table(SPONSOR_MENTIONS_CSV)
+        if not articles_df.empty:
+            articles_df, new_mentions_df = clean_articles(articles_df)
+            daily_article_df = merge_daily_articles(daily_article_df, aggregate_daily_articles(articles_df, new_mentions_df))
+            mentions_df = pd.concat([mentions_df, new_mentions_df], ignore_index=True)
+            mentions_df['sponsor'] = mentions_df['sponsor'].astype('category')
+    else:
+        # without earlier cleaned data or when cleaning again, clean the full raw csv
+        if incremental:
+            articles_df = pd.read_csv(os.path.join(RAW_DATA_DIR, ARTICLE_CSV))
+        articles_df, mentions_df = clean_articles(articles_df)
+        daily_article_df = aggregate_daily_articles(articles_df, mentions_df)
+
+    try:  
+        # save cleaned data and sponsor mentions with typed columns
+        write_table(mentions_df, SPONSOR_MENTIONS_CSV, MENTIONS_SCHEMA)
+        return write_table(daily_article_df, CLEANED_ARTICLE_CSV, {'Date': DATE}, default='int32')
     # return exception if error occurs
     except Exception as e:
-        print(f"Error saving GSW stats data to CSV file: {e}")
+        print(f"Error saving GSW articles data: {e}")
         return None
     
-def add_to_all_trends(sponsor,trend_df):
+# raw drive file, raw trends file and cleaned trends file of each Google Trends keyword
+TREND_FILES = {
+    'Golden State Warriors': (GSW_DRIVE_CSV, GSW_TREND_CSV, GSW_CLEANED_TREND_CSV),
+    'Rakuten': (RAKUTEN_DRIVE_CSV, RAKUTEN_TREND_CSV, RAKUTEN_CLEANED_TREND_CSV),
+    'United Airlines': (UNITED_DRIVE_CSV, UNITED_TREND_CSV, UNITED_CLEANED_TREND_CSV),
+    'JPMorgan Chase': (CHASE_DRIVE_CSV, CHASE_TREND_CSV, CHASE_CLEANED_TREND_CSV),
+}
+
+
+class TrendsTable:
+    """
+    Wide table of every keyword's scaled and adjusted trend series on one shared daily index.
+    Series are aligned by date in memory and a keyword processed again replaces its own columns,
+    so building the table any number of times gives the same result and it is written once.
+    """
+
+    def __init__(self):
+        self.index = pd.date_range(start=START_DATE, end=END_DATE, freq='D', name='Date')
+        self.columns = {}
+
+    @classmethod
+    def load(cls, name=ALL_TRENDS_CSV):
+        """
+        :param name: all trends dataset file name
+        :return: TrendsTable holding the columns of a saved table, or an empty TrendsTable
+        """
+        trends_table = cls()
+        if table_exists(name):
+            all_trends_df = read_table(name).set_index('Date')
+            # columns with merge suffixes were duplicated by earlier runs and are left out
+            for column in all_trends_df.columns:
+                if not column.endswith(('_x', '_y')):
+                    trends_table.columns[column] = all_trends_df[column].reindex(trends_table.index)
+        return trends_table
+
+    def upsert(self, sponsor, trend_df):
+        """
+        Adds or replaces the scaled and adjusted columns of a keyword.
+
+        :param sponsor: Google Trends keyword
+        :param trend_df: cleaned trends DataFrame of keyword with a Date column
+        """
+        trend_df = trend_df.set_index('Date')
+        for column in [sponsor, f"{sponsor.replace(' ','')}_adjusted"]:
+            self.columns[column] = trend_df[column].reindex(self.index)
+
+    def to_frame(self):
+        """
+        :return: DataFrame of Date and every keyword's columns, in the order keywords were first added
+        """
+        return pd.DataFrame(self.columns, index=self.index).reset_index()
+
+    def save(self, name=ALL_TRENDS_CSV):
+        """
+        :param name: all trends dataset file name
+        :return: typed DataFrame that was written
+        """
+        return write_table(self.to_frame(), name, {'Date': DATE}, default='float64')
+
+
+def add_to_all_trends(sponsor, trend_df, trends_table=None):
     """
-    Adds cleaned and scaled data to an all sponsor trends table, creates new file if CSV doesn't exist,
-    updates and loads to CSV if file exists.
+    Adds cleaned and scaled data to an all sponsor trends table. When a shared TrendsTable is given the
+    data is only added in memory and saved by the caller, otherwise the saved table is updated right away.
 
     :param sponsor: keyword to pull trend data
-    :param all_sponsors: add trend data to all_sponsor_trends CSV
+    :param trend_df: cleaned trends DataFrame of keyword
+    :param trends_table: TrendsTable collecting all keywords
     :return: None
     """
-    # path to place files into data folder
-    all_trends_csv_path = os.path.join(CLEANED_DATA_DIR, ALL_TRENDS_CSV)
-    os.makedirs(os.path.dirname(all_trends_csv_path), exist_ok=True)   
+    if trends_table is not None:
+        trends_table.upsert(sponsor, trend_df)
+        return None
 
-    # If file already exists, load it
-    if os.path.exists(all_trends_csv_path):
-        all_trends_df = pd.read_csv(all_trends_csv_path, parse_dates=['Date'])
-    else:
-        # Start new combined file with just the Date column
-        all_trends_df = trend_df[["Date"]].copy() 
+    trends_table = TrendsTable.load()
+    trends_table.upsert(sponsor, trend_df)
+    trends_table.save()
 
-    # Join scaled sponsor data based on Date
-    all_trends_df = all_trends_df.merge(
-        trend_df[["Date", f"{sponsor}", f'{sponsor.replace(' ','')}_adjusted']], 
-        on="Date", 
-        how="outer"
-    )
+    return None
 
-    # convert df to csv
-    all_trends_df.to_csv(all_trends_csv_path, index=False)
+def retrieve_trends_data(keywords=TEAM_AND_SPONSORS) -> dict:
+    """
+    Retrieves the raw daily trend data of several keywords from the Google Trends API in one batch,
+    so month windows of every keyword are scheduled together through one shared rate limiter.
 
-    return None
+    :param keywords: keywords to pull trend data
+    :return: dictionary of keyword to raw trends DataFrame, or None if any keyword could not be retrieved
+    """
+    all_trends = get_all_sponsor_trends(list(keywords), extract_dir = RAW_DATA_DIR)
+    missing = [keyword for keyword, trend_df in all_trends.items() if trend_df is None]
+    if missing:
+        print(f"Error retrieving trends data of {', '.join(missing)}")
+        return None
+    return all_trends
 
-def process_trends_data(sponsor,retrieve_api=False, all_sponsors=False) -> pd.DataFrame:
+def load_raw_trends_data(keywords=TEAM_AND_SPONSORS) -> dict:
+    """
+    :param keywords: keywords saved by retrieve_trends_data
+    :return: dictionary of keyword to raw trends DataFrame read from the raw trends files, or None
     """
-    Cleans and transforms trend data from Google Trends, saves the cleaned data to CSV,
+    try:
+        return {keyword: pd.read_csv(os.path.join(RAW_DATA_DIR, f"{keyword.replace(' ','')}_Trends.csv")) for keyword in keywords}
+    # return exception if error occurs
+    except Exception as e:
+        print(f"Error reading raw trends data: {e}")
+        return None
+
+def process_trends_data(sponsor,retrieve_api=False, all_sponsors=False, trends_table=None, trend_df=None) -> pd.DataFrame:
+    """
+    Cleans and transforms trend data from Google Trends, saves the cleaned data,
     and loads the data to a pandas DataFrame. 
 
     :param sponsor: keyword to pull trend data
     :param retrieve_api: retrieve GSW trends from Google trends API
-    :param all_sponsors: add trend data to all_sponsor_trends CSV
+    :param all_sponsors: add trend data to the all sponsor trends table
+    :param trends_table: TrendsTable to add trend data to, saved by the caller once every keyword is added
+    :param trend_df: raw trends DataFrame already retrieved, e.g. by retrieve_trends_data, instead of retrieving it
     :return: Pandas DataFrame or None
     """
-    # Retrieve data from sources for GSW and Major Sponsors
-    if retrieve_api == True:
+    # keywords other than the team and its major sponsors use the JPMorgan Chase files
+    drive_csv, trend_csv, cleaned_file = TREND_FILES.get(sponsor, TREND_FILES['JPMorgan Chase'])
+
+    # Retrieve data from sources for GSW and Major Sponsors, unless it was already retrieved
+    if trend_df is None and retrieve_api == True:
         trend_df = get_gsw_sponsor_trends(sponsor,extract_dir = RAW_DATA_DIR)
-    else:
-        if sponsor == 'Golden State Warriors':
-            trend_df = download_gdrive_file(GSW_DRIVE_CSV,GSW_TREND_CSV,extract_dir = RAW_DATA_DIR)
-            cleaned_file = GSW_CLEANED_TREND_CSV
-        elif sponsor == 'Rakuten':
-            trend_df = download_gdrive_file(RAKUTEN_DRIVE_CSV,RAKUTEN_TREND_CSV,extract_dir = RAW_DATA_DIR)
-            cleaned_file = RAKUTEN_CLEANED_TREND_CSV
-        elif sponsor == 'United Airlines':
-            trend_df = download_gdrive_file(UNITED_DRIVE_CSV, UNITED_TREND_CSV,extract_dir = RAW_DATA_DIR)
-            cleaned_file = UNITED_CLEANED_TREND_CSV
-        else:
-            trend_df = download_gdrive_file(CHASE_DRIVE_CSV,CHASE_TREND_CSV,extract_dir = RAW_DATA_DIR)
-            cleaned_file = CHASE_CLEANED_TREND_CSV
+    elif trend_df is None:
+        trend_df = download_gdrive_file(drive_csv,trend_csv,extract_dir = RAW_DATA_DIR)
 
     # if issue arises and trend df is empty, return none
     if trend_df is None:
         print('trend_df returned empty')
         return None
     
-    # path to place files into data folder
-    cleaned_csv_path = os.path.join(CLEANED_DATA_DIR, cleaned_file)
-    os.makedirs(os.path.dirname(cleaned_csv_path), exist_ok=True)
-
     # update data range to start from 2020-12-22 (start of 2021 season) to 2025-04-13 (end of 2025 season)
+    trend_df = trend_df.reset_index(drop=True)
     trend_df['Date'] = pd.date_range(start=TREND_START_DATE,end=TREND_END_DATE,freq='D')
-    trend_df = trend_df[(trend_df['Date'] >= START_DATE) & (trend_df['Date'] <= END_DATE)]
+    trend_df = trend_df[(trend_df['Date'] >= START_DATE) & (trend_df['Date'] <= END_DATE)].copy()
 
     # create new column for time delay adjustment, shifting all trend values forward by 1 day
     trend_df[f'{sponsor.replace(' ','')}_adjusted'] = trend_df[f'{sponsor}'].shift(-1)
@@ -234,36 +522,95 @@ def process_trends_data(sponsor,retrieve_api=False, all_sponsors=False) -> pd.Da
     # reorder columns
     trend_df = trend_df.reindex(columns=['Date',f'{sponsor}_unscaled',f'{sponsor}_monthly','isPartial','scale',f'{sponsor}',f'{sponsor.replace(' ','')}_adjusted'])
 
-    # if not in the all sponsors df, add data
+    # add or replace data in the all sponsors table
     if all_sponsors == True:
-        add_to_all_trends(sponsor, trend_df)
+        add_to_all_trends(sponsor, trend_df, trends_table)
     try:  
-        # save cleaned data to csv
-        trend_df.to_csv(cleaned_csv_path, index=False)
-
-        return trend_df
+        # save cleaned data with typed columns
+        return write_table(trend_df, cleaned_file, TRENDS_SCHEMA, default='float64')
     # return exception if error occurs
     except Exception as e:
-        print(f"Error saving {sponsor} trend data to CSV file: {e}")
+        print(f"Error saving {sponsor} trend data: {e}")
         return None
     
+def load_trend_components(sponsor, extract_dir=RAW_DATA_DIR) -> pd.DataFrame:
+    """
+    Loads the unscaled daily values and monthly anchors of a keyword from its cached month windows,
+    or from its raw trends file when the windows were not cached, without any request.
+
+    :param sponsor: Google Trends keyword
+    :param extract_dir: raw data directory
+    :return: Pandas DataFrame indexed by Date with <keyword>_unscaled and <keyword>_monthly columns, or None
+    """
+    trend_df = load_cached_windows(sponsor, extract_dir=extract_dir)
+    if trend_df is None:
+        _, trend_csv, _ = TREND_FILES.get(sponsor, TREND_FILES['JPMorgan Chase'])
+        try:
+            trend_df = pd.read_csv(os.path.join(extract_dir, trend_csv))
+        # return exception if error occurs
+        except Exception as e:
+            print(f"Error reading {sponsor} trend data: {e}")
+            return None
+        # raw files have one row per day of the trends range, like in process_trends_data
+        trend_df.index = pd.date_range(start=TREND_START_DATE, end=TREND_END_DATE, freq='D')
+
+    return trend_df[[f'{sponsor}_unscaled', f'{sponsor}_monthly']].rename_axis('Date')
+
+def rescale_trends_data(keywords=TEAM_AND_SPONSORS, **kwargs) -> pd.DataFrame:
+    """
+    Re-stitches the daily trend data of several keywords from their unscaled month windows and monthly
+    anchors, optionally for a sub-range and with another normalization, without requesting them again.
+
+    :param keywords: Google Trends keywords
+    :param season: season year from SEASON_TIME_RANGES to limit the data to
+    :param start_date: first day of sub-range, used when no season is given
+    :param end_date: last day of sub-range, used when no season is given
+    :param normalize: "monthly" for the pytrends scale, "peak" so each keyword's highest day in the range is 100
+    :param anchor: keyword every keyword is expressed as a percentage of, e.g. TEAM
+    :param extract_dir: raw data directory
+    :return: Pandas DataFrame of Date and one scaled column per keyword, or None
+    """
+    components = [load_trend_components(keyword, kwargs.get('extract_dir', RAW_DATA_DIR)) for keyword in keywords]
+    if any(component is None for component in components):
+        return None
+
+    start_date, end_date = kwargs.get('start_date', START_DATE), kwargs.get('end_date', END_DATE)
+    if kwargs.get('season') is not None:
+        _, start_date, end_date = next(season for season in SEASON_TIME_RANGES if season[0] == kwargs['season'])
+
+    # align every keyword on one daily index so all are rescaled in one pass
+    trend_df = pd.concat(components, axis=1)
+    unscaled = trend_df[[f'{keyword}_unscaled' for keyword in keywords]].set_axis(keywords, axis=1)
+    monthly = trend_df[[f'{keyword}_monthly' for keyword in keywords]].set_axis(keywords, axis=1)
+
+    return rescale_daily(unscaled, monthly, start_date=start_date, end_date=end_date,
+                         normalize=kwargs.get('normalize', 'monthly'), anchor=kwargs.get('anchor')).reset_index()
+
+def season_column(dates: pd.Series) -> pd.Series:
+    """
+    Assigns every date to its season from SEASON_TIME_RANGES in one pass over an IntervalIndex of season date ranges.
+
+    :param dates: Series of dates
+    :return: Series of season years, missing for dates between seasons
+    """
+    seasons = pd.IntervalIndex.from_arrays(pd.to_datetime([start_date for _, start_date, _ in SEASON_TIME_RANGES]),
+                                           pd.to_datetime([end_date for _, _, end_date in SEASON_TIME_RANGES]), closed='both')
+    season = pd.cut(dates, seasons).cat.rename_categories([year for year, _, _ in SEASON_TIME_RANGES])
+    return season.astype('Int16')
+
 def combine_all_data(stats_df,articles_df,all_trends_csv) -> pd.DataFrame:
     """
     Combines data from stats_df, articles_df, and trend_df into one dataframe 
-    for easier plotting and analysis.
+    for easier plotting and analysis. The data is saved as one dataset partitioned by season,
+    load it with load_all_data.
 
     :param stats_df: GSW stats dataframe
     :param articles_df: GSW news articles dataframe
-    :param trend_df: Google Trends dataframe
-    :param all_sponsors: add trend data to all_sponsor_trends CSV
+    :param all_trends_csv: all trends dataset file name or path
     :return: Pandas DataFrame or None
     """
-    # path to place files into data folder
-    cleaned_csv_path = os.path.join(CLEANED_DATA_DIR, ALL_SEASONS_DATA_CSV)
-    os.makedirs(os.path.dirname(cleaned_csv_path), exist_ok=True)
-
-    # open all trends csv
-    trends_df = pd.read_csv(all_trends_csv,parse_dates=["Date"])
+    # open all trends table
+    trends_df = read_table(all_trends_csv)
 
     # keep relevant columns from cleaned stats csv
     stats_keep = stats_df[['Date','Win','Abs_Point_Difference','Hi_Points_Player', 'Hi_Points_Value','Hi_Rebounds_Player', 'Hi_Rebounds_Value','Hi_Assists_Player', 'Hi_Assists_Value']].copy()
@@ -271,7 +618,7 @@ def combine_all_data(stats_df,articles_df,all_trends_csv) -> pd.DataFrame:
     stats_keep['Curry_Hi_Points_Value'] = np.where(stats_keep['Curry_Hi_Points'] == 1,stats_keep['Hi_Points_Value'],np.nan)
 
     # keep relevant columns from cleaned articles csv
-    articles_keep = articles_df[['Date','Article_Count','Rakuten_Count','UnitedAirlines_Count','Chase_Count']]
+    articles_keep = articles_df[['Date','Article_Count'] + [count_column(sponsor) for sponsor in SPONSOR_REGISTRY]]
     
     # initialize data frame for all data
     full_date_range = pd.DataFrame({"Date": pd.date_range(start=START_DATE, end=END_DATE)})
@@ -281,33 +628,27 @@ def combine_all_data(stats_df,articles_df,all_trends_csv) -> pd.DataFrame:
     combined_df = combined_df.merge(articles_keep, on='Date',how='left')
     combined_df = combined_df.merge(stats_keep, on='Date',how='left')
 
-    # create for loop to have data separated for each individual season
-    for index, (year,start_date,end_date) in enumerate(SEASON_TIME_RANGES):
-        # convert year from int to string
-        year = str(year)
-
-        # path to place files into data folder
-        cleaned_season_csv_path = os.path.join(CLEANED_DATA_DIR, f'{SEASON_DATA_CSV[index]}')
-        os.makedirs(os.path.dirname(cleaned_season_csv_path), exist_ok=True)
-
-        season_range = (combined_df['Date'] >= pd.to_datetime(start_date)) & (combined_df['Date'] <= pd.to_datetime(end_date))
-
-        # index combined df based on season dates
-        season_df = combined_df.loc[season_range]
-
-        try:  
-            # save season data to csv
-            season_df.to_csv(cleaned_season_csv_path, index=False)
-        # return exception if error occurs
-        except Exception as e:
-            print(f"Error saving GSW stats data to CSV file: {e}")
+    # label each day with its season instead of saving a separate copy of every season
+    combined_df.insert(1, 'Season', season_column(combined_df['Date']))
 
     try:  
-        # save all data to csv
-        combined_df.to_csv(cleaned_csv_path, index=False)
-
-        return combined_df
+        # save all data partitioned by season with typed columns
+        return write_partitioned(combined_df, ALL_DATA_DATASET, 'Season', ALL_DATA_SCHEMA, default='float64')
     # return exception if error occurs
     except Exception as e:
-        print(f"Error saving GSW stats data to CSV file: {e}")
-        return None
\ No newline at end of file
+        print(f"Error saving GSW combined data: {e}")
+        return None
+
+def load_all_data(seasons=None, columns=None, **kwargs) -> pd.DataFrame:
+    """
+    Loads the combined data saved by combine_all_data, reading only the requested seasons and columns.
+
+    :param seasons: list of season years, every day including days between seasons if not given
+    :param columns: list of columns to read, all columns if not given
+    :param data_dir: directory of combined dataset
+    :return: Pandas DataFrame sorted by date
+    """
+    if columns is not None and 'Date' not in columns:
+        columns = ['Date'] + list(columns)
+    partitions = None if seasons is None else {'Season': list(seasons)}
+    return read_partitioned(ALL_DATA_DATASET, partitions, columns, schema=ALL_DATA_SCHEMA, sort_by='Date', **kwargs)
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+import patsy
+from scipy import stats
+
+# columns of the tidy regression results
+RESULT_COLUMNS = ["formula", "dataset", "term", "coef", "se", "t", "p", "r_squared", "n"]
+
+
+def is_data_dependent(design_info):
+    """
+    :param design_info: patsy DesignInfo
+    :return: True if a factor is categorical or uses a stateful transform such as center or standardize,
+             whose columns depend on the rows they are built from
+    """
+    return any(info.type == "categorical" or info.state.get("transforms") for info in design_info.factor_infos.values())
+
+def term_matrices(terms, datasets, stacked, matrices):
+    """
+    Evaluates one side of a formula on every dataset. Sides whose columns do not depend on the rows
+    are built once over the stacked datasets and split by dataset, categorical factors and stateful
+    transforms are built on each dataset on its own like a separate statsmodels fit.
+
+    :param terms: list of patsy Terms of one side of a formula
+    :param datasets: dictionary of dataset name to DataFrame
+    :param stacked: DataFrame of every dataset stacked together
+    :param matrices: dictionary of term names to matrices already built, shared by every formula
+    :return: list of column names and numpy array of the terms evaluated on every row of each dataset, missing values kept
+    """
+    key = tuple(term.name() for term in terms)
+    if key not in matrices:
+        # missing values are kept so rows line up with the datasets
+        matrix = patsy.dmatrix(patsy.ModelDesc([], terms), stacked, NA_action=patsy.NAAction(NA_types=[]), return_type="matrix")
+        if is_data_dependent(matrix.design_info):
+            matrices[key] = []
+            for df in datasets.values():
+                # rows patsy drops for a missing category come back as missing values
+                part = patsy.dmatrix(patsy.ModelDesc([], terms), df.reset_index(drop=True), return_type="dataframe")
+                matrices[key].append((list(part.columns), part.reindex(range(len(df))).to_numpy(dtype="float64")))
+        else:
+            offsets = np.cumsum([0] + [len(df) for df in datasets.values()])
+            matrices[key] = [(matrix.design_info.column_names, np.asarray(matrix)[start:end])
+                             for start, end in zip(offsets[:-1], offsets[1:])]
+    return matrices[key]
+
+def design_matrices(formulas, datasets):
+    """
+    Builds the response and design matrix of every formula on every dataset, each side of a formula
+    only once even when formulas share it, dropping rows with a missing value like statsmodels does.
+
+    :param formulas: list of patsy formulas, e.g. 'Q("United Airlines") ~ Abs_Point_Difference'
+    :param datasets: dictionary of dataset name to DataFrame
+    :return: list of (formula, dataset name, term names, whether there is an intercept, y, X) in formula then dataset order
+    """
+    stacked = pd.concat(list(datasets.values()), ignore_index=True)
+
+    matrices = {}
+    designs = []
+    for formula in formulas:
+        model = patsy.ModelDesc.from_formula(formula)
+        responses = term_matrices(model.lhs_termlist, datasets, stacked, matrices)
+        predictors = term_matrices(model.rhs_termlist, datasets, stacked, matrices)
+        for name, (_, y), (terms, X) in zip(datasets, responses, predictors):
+            y = y[:, 0]
+            complete = ~np.isnan(y) & ~np.isnan(X).any(axis=1)
+            designs.append((formula, name, terms, "Intercept" in terms, y[complete], X[complete]))
+    return designs
+
+def batched_ols(formulas, datasets):
+    """
+    Fits every formula on every dataset with ordinary least squares in one batch. Designs are
+    zero-padded to the same number of rows and terms, which adds nothing to any fit, and solved
+    together with one stacked pseudo-inverse like statsmodels' default OLS fit.
+
+    :param formulas: list of patsy formulas
+    :param datasets: dictionary of dataset name to DataFrame
+    :return: tidy DataFrame with one row per formula, dataset and term of columns formula, dataset,
+             term, coef, se, t, p, r_squared and n
+    """
+    designs = design_matrices(formulas, datasets)
+    if not designs:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    n = np.array([len(y) for _, _, _, _, y, _ in designs], dtype="int64")
+    k = np.array([X.shape[1] for _, _, _, _, _, X in designs], dtype="int64")
+
+    y = np.zeros((len(designs), n.max(initial=0)))
+    X = np.zeros((len(designs), n.max(initial=0), k.max(initial=0)))
+    for index, (_, _, _, _, y_fit, X_fit) in enumerate(designs):
+        y[index, :len(y_fit)] = y_fit
+        X[index, :len(y_fit), :X_fit.shape[1]] = X_fit
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pinv = np.linalg.pinv(X)
+        coef = (pinv @ y[:, :, None])[:, :, 0]
+        # the pseudo-inverse of a design without rows is zero, but nothing was fitted
+        coef[n == 0] = np.nan
+        residuals = y - (X @ coef[:, :, None])[:, :, 0]
+        ssr = (residuals ** 2).sum(axis=1)
+        df_resid = n - np.linalg.matrix_rank(X)
+
+        # standard errors from the residual variance and the pseudo-inverse, as statsmodels computes them
+        scale = ssr / df_resid
+        se = np.sqrt(scale[:, None] * (pinv ** 2).sum(axis=2))
+        t = coef / se
+        p = 2 * stats.t.sf(np.abs(t), df_resid[:, None])
+
+        # R squared around the mean when there is an intercept, around zero otherwise
+        rows = np.arange(y.shape[1]) < n[:, None]
+        y_mean = y.sum(axis=1) / n
+        has_intercept = np.array([design[3] for design in designs], dtype=bool)
+        tss = np.where(has_intercept, (np.where(rows, y - y_mean[:, None], 0.0) ** 2).sum(axis=1), (y ** 2).sum(axis=1))
+        r_squared = 1 - ssr / tss
+
+    # one tidy row per term of every fit
+    fit, term = np.nonzero(np.arange(k.max(initial=0)) < k[:, None])
+    return pd.DataFrame({"formula": [designs[index][0] for index in fit], "dataset": [designs[index][1] for index in fit],
+                         "term": [designs[index][2][position] for index, position in zip(fit, term)],
+                         "coef": coef[fit, term], "se": se[fit, term], "t": t[fit, term], "p": p[fit, term],
+                         "r_squared": r_squared[fit], "n": n[fit]}, columns=RESULT_COLUMNS)
+
+def statsmodels_check(results, datasets, rtol=1e-6):
+    """
+    Fits every formula and dataset of a results table again with statsmodels and compares them.
+    statsmodels is only needed for this check.
+
+    :param results: tidy DataFrame from batched_ols
+    :param datasets: dictionary of dataset name to DataFrame
+    :param rtol: relative tolerance of the comparison
+    :return: list of (formula, dataset) pairs whose results differ, or None if statsmodels is not installed
+    """
+    try:
+        import statsmodels.formula.api as smf
+    except ImportError:
+        print("statsmodels is not installed, skipping the regression cross-check")
+        return None
+
+    mismatches = []
+    for (formula, name), fit in results.groupby(["formula", "dataset"], sort=False):
+        try:
+            model = smf.ols(formula=formula, data=datasets[name]).fit()
+        # a fit statsmodels cannot make, e.g. without any complete row, is a difference
+        except Exception as e:
+            print(f"Error fitting {formula} on {name} with statsmodels: {e}")
+            mismatches.append((formula, name))
+            continue
+        expected = pd.DataFrame({"coef": model.params, "se": model.bse, "t": model.tvalues, "p": model.pvalues})
+        # a term missing from either fit, e.g. a category absent from one dataset, is a difference
+        if set(expected.index) != set(fit["term"]):
+            mismatches.append((formula, name))
+            continue
+        expected = expected.loc[fit["term"]]
+        matches = np.allclose(fit[["coef", "se", "t", "p"]].to_numpy(), expected.to_numpy(), rtol=rtol, atol=1e-12, equal_nan=True)
+        if not matches or not np.isclose(fit["r_squared"].iloc[0], model.rsquared, rtol=rtol, equal_nan=True) or fit["n"].iloc[0] != model.nobs:
+            mismatches.append((formula, name))
+
+    print(f"statsmodels cross-check: {results.groupby(['formula', 'dataset']).ngroups - len(mismatches)} fits match, {len(mismatches)} differ")
+    return mismatches
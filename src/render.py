@@ -0,0 +1,340 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import matplotlib
+import matplotlib.dates as mdates
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from artifact_store import file_sha256
+from config import PLOT_WORKERS, PLOT_MAX_PROCESSES, PLOT_MANIFEST_JSON
+
+# comparisons a plot layer can filter rows with, e.g. ("Win", "==", 1)
+OPERATORS = {"==": np.equal, ">": np.greater, "<=": np.less_equal}
+
+# shared memory blocks attached by a render worker, by name
+ATTACHED = {}
+# figures drawn in the calling process are drawn one at a time, Matplotlib is not thread-safe
+RENDER_LOCK = threading.Lock()
+# plot functions running in several threads update one manifest file
+MANIFEST_LOCK = threading.Lock()
+# render processes not taken by a plot function, shared by plot functions running in several threads
+RENDER_SLOTS = {"free": PLOT_MAX_PROCESSES}
+RENDER_SLOTS_LOCK = threading.Lock()
+
+
+def job_columns(job):
+    """
+    :param job: plot job spec
+    :return: list of columns of the shared data a job reads
+    """
+    if job["kind"] == "heatmap":
+        return []
+    columns = ["Date"]
+    for layer in job["layers"]:
+        columns += [layer["x"], layer["y"]] + [column for column, _, _ in layer.get("where", [])]
+    return columns
+
+def frame_arrays(df, columns):
+    """
+    :param df: pandas DataFrame
+    :param columns: list of columns
+    :return: dictionary of column to numpy array, datetime64[ns] for dates and float64 with NaN for anything else
+    """
+    arrays = {}
+    for column in dict.fromkeys(columns):
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            arrays[column] = df[column].to_numpy(dtype="datetime64[ns]")
+        else:
+            arrays[column] = df[column].to_numpy(dtype="float64", na_value=np.nan)
+    return arrays
+
+
+class SharedFrame:
+    """
+    Columns of a DataFrame copied once into one shared memory block, so render workers read them
+    in place instead of receiving a pickled copy of the data with every job.
+    """
+
+    def __init__(self, arrays):
+        """
+        :param arrays: dictionary of column to numpy array from frame_arrays
+        """
+        self.layout = []
+        offset = 0
+        for column, array in arrays.items():
+            self.layout.append((column, array.dtype.str, offset, len(array)))
+            offset += array.nbytes
+        self.shm = SharedMemory(create=True, size=max(offset, 1))
+        for column, dtype, start, length in self.layout:
+            np.ndarray(length, dtype=dtype, buffer=self.shm.buf, offset=start)[:] = arrays[column]
+
+    @property
+    def spec(self):
+        """
+        :return: name and column layout of the block, small enough to send with every job
+        """
+        return self.shm.name, self.layout
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+def attach(spec):
+    """
+    :param spec: SharedFrame.spec
+    :return: dictionary of column to read-only numpy array inside the shared block
+    """
+    name, layout = spec
+    if name not in ATTACHED:
+        ATTACHED[name] = SharedMemory(name=name)
+    buffer = ATTACHED[name].buf
+    arrays = {}
+    for column, dtype, start, length in layout:
+        arrays[column] = np.ndarray(length, dtype=dtype, buffer=buffer, offset=start)
+        arrays[column].flags.writeable = False
+    return arrays
+
+def job_rows(job, data):
+    """
+    :param job: plot job spec
+    :param data: dictionary of column to numpy array
+    :return: boolean numpy array of rows in the job's date range, e.g. a season
+    """
+    rows = np.ones(len(data["Date"]), dtype=bool)
+    if job.get("rows"):
+        start_date, end_date = (np.datetime64(pd.to_datetime(date)) for date in job["rows"])
+        rows = (data["Date"] >= start_date) & (data["Date"] <= end_date)
+    return rows
+
+def job_sha256(job, data):
+    """
+    :param job: plot job spec
+    :param data: dictionary of column to numpy array
+    :return: hex sha256 of the job's parameters, the rows of data it draws and the renderer, which decide the saved file
+    """
+    digest = hashlib.sha256()
+    params = {key: value for key, value in job.items() if key != "message"}
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(f"{matplotlib.__version__}:{sns.__version__}:{file_sha256(__file__)}".encode("utf-8"))
+
+    # heatmaps carry their values in the spec, other plots only draw the rows of their date range
+    columns = job_columns(job)
+    rows = job_rows(job, data) if columns else None
+    for column in dict.fromkeys(columns):
+        digest.update(f"{column}:{data[column].dtype.str}\n".encode("utf-8"))
+        digest.update(np.ascontiguousarray(data[column][rows]).tobytes())
+    return digest.hexdigest()
+
+
+class PlotManifest:
+    """
+    sha256 of the job each plot file was last rendered from, so a plot is only drawn again when
+    its data slice, its parameters or the renderer changed, or the file is gone.
+    """
+
+    def __init__(self, path=PLOT_MANIFEST_JSON):
+        """
+        :param path: path of manifest JSON file
+        """
+        self.path = path
+        self.entries = {}
+        self.rendered = {}
+        try:
+            with open(path, encoding="utf-8") as file:
+                self.entries = json.load(file)
+        # a missing or unreadable manifest only means every plot is drawn again
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_current(self, plot_path, sha256):
+        """
+        :param plot_path: path of plot file
+        :param sha256: job_sha256 of the job saving plot_path
+        :return: True if plot_path exists and was rendered from the same job
+        """
+        return self.entries.get(plot_path) == sha256 and os.path.exists(plot_path)
+
+    def record(self, plot_path, sha256):
+        self.rendered[plot_path] = sha256
+
+    def save(self):
+        """
+        Writes the plots rendered since the manifest was opened, keeping entries other callers wrote meanwhile.
+        """
+        if not self.rendered:
+            return
+        with MANIFEST_LOCK:
+            saved = PlotManifest(self.path).entries
+            saved.update(self.rendered)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(saved, file, indent=4, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        self.entries.update(self.rendered)
+        self.rendered = {}
+
+def layer_rows(data, layer, rows):
+    """
+    :param data: dictionary of column to numpy array
+    :param layer: plot layer spec
+    :param rows: boolean numpy array of rows in the job's date range
+    :return: boolean numpy array of rows the layer draws
+    """
+    for column, operator, value in layer.get("where", []):
+        rows = rows & OPERATORS[operator](data[column], value)
+    return rows
+
+def draw_plot(job, data):
+    """
+    Draws a time series figure of line and scatter layers with the object-oriented Matplotlib API.
+
+    :param job: plot job spec
+    :param data: dictionary of column to numpy array
+    :return: Figure
+    """
+    figure = Figure(figsize=job["figsize"])
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    # limit rows to the job's date range, e.g. a season
+    rows = job_rows(job, data)
+
+    for layer in job["layers"]:
+        layer_mask = layer_rows(data, layer, rows)
+        draw = ax.plot if layer["kind"] == "plot" else ax.scatter
+        draw(data[layer["x"]][layer_mask], data[layer["y"]][layer_mask], **layer["style"])
+
+    # add labels
+    ax.set_title(job["title"], fontsize=job["title_size"])
+    ax.legend()
+    ax.set_xlabel(job["xlabel"], fontsize=job["label_size"])
+    ax.set_ylabel(job["ylabel"], fontsize=job["label_size"])
+    figure.tight_layout()
+
+    # adjust time markers
+    if job.get("xlim"):
+        ax.set_xlim(*(pd.to_datetime(date) for date in job["xlim"]))
+    ax.xaxis.set_major_locator(mdates.DayLocator(interval=job["day_interval"]))
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y-%m-%d"))
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)
+    figure.subplots_adjust(bottom=0.1)
+    return figure
+
+def draw_heatmap(job, data):
+    """
+    Draws an annotated correlation matrix.
+
+    :param job: heatmap job spec with the matrix values and its columns
+    :param data: dictionary of column to numpy array, unused
+    :return: Figure
+    """
+    figure = Figure(figsize=job.get("figsize", (10,8)))
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    matrix = pd.DataFrame(job["values"], index=job["columns"], columns=job["columns"])
+    sns.heatmap(matrix, annot=True, fmt=".2f", cmap="coolwarm_r", vmin=-1, vmax=1, ax=ax)
+    ax.set_title(job["title"])
+    figure.tight_layout()
+    return figure
+
+def reserve_workers(wanted):
+    """
+    :param wanted: number of render processes a plot function would start
+    :return: number of render processes it may start, at most the ones other plot functions are not using
+    """
+    with RENDER_SLOTS_LOCK:
+        workers = max(0, min(wanted, RENDER_SLOTS["free"]))
+        RENDER_SLOTS["free"] -= workers
+        return workers
+
+def release_workers(workers):
+    """
+    :param workers: number of render processes from reserve_workers that have finished
+    """
+    with RENDER_SLOTS_LOCK:
+        RENDER_SLOTS["free"] += workers
+
+def render_job(job, data):
+    """
+    :param job: plot job spec
+    :param data: dictionary of column to numpy array, or SharedFrame.spec in a worker
+    :return: path of saved plot
+    """
+    if isinstance(data, tuple):
+        data = attach(data)
+    figure = draw_heatmap(job, data) if job["kind"] == "heatmap" else draw_plot(job, data)
+    figure.savefig(job["path"])
+    return job["path"]
+
+def render_plots(jobs, df, workers=PLOT_WORKERS, **kwargs):
+    """
+    Renders independent plot jobs of one DataFrame. Each job is a dictionary spec of its data slice,
+    layout and output path, so jobs can be drawn in any order and in separate processes. The columns
+    the jobs read are shared with every worker through one shared memory block. Jobs whose file exists
+    and whose data slice and parameters are unchanged since it was rendered are skipped.
+
+    :param jobs: list of plot job specs
+    :param df: pandas DataFrame the jobs plot
+    :param workers: number of render processes, at most the PLOT_MAX_PROCESSES not used by other plot functions,
+                    jobs are drawn in this process when 1 or none are free
+    :param force: render every job even if unchanged
+    :param manifest_path: path of plot manifest JSON file
+    :return: dictionary of plot path to "rebuilt" or "skipped", in job order
+    """
+    data = frame_arrays(df, [column for job in jobs for column in job_columns(job)])
+    manifest = PlotManifest(kwargs.get("manifest_path", PLOT_MANIFEST_JSON))
+
+    report = {}
+    pending = []
+    for job in jobs:
+        sha256 = job_sha256(job, data)
+        if not kwargs.get("force") and manifest.is_current(job["path"], sha256):
+            report[job["path"]] = "skipped"
+        else:
+            report[job["path"]] = "rebuilt"
+            pending.append((job, sha256))
+
+    # plot functions running at once share PLOT_MAX_PROCESSES, one per CPU, since starting a worker costs more than it
+    # saves when there is no other CPU to draw on
+    workers = reserve_workers(min(workers, len(pending)))
+    try:
+        if workers <= 1:
+            for job, sha256 in pending:
+                with RENDER_LOCK:
+                    render_job(job, data)
+                manifest.record(job["path"], sha256)
+                print(job["message"])
+        else:
+            shared = SharedFrame(data)
+            try:
+                # spawn so workers never inherit a half-initialized matplotlib or thread state of the caller
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                    futures = [executor.submit(render_job, job, shared.spec) for job, _ in pending]
+                    for (job, sha256), future in zip(pending, futures):
+                        future.result()
+                        manifest.record(job["path"], sha256)
+                        print(job["message"])
+            finally:
+                shared.close()
+    # plots finished before a failure are kept in the manifest
+    finally:
+        release_workers(workers)
+        manifest.save()
+
+    skipped = [path for path, status in report.items() if status == "skipped"]
+    print(f"Plots rebuilt: {len(report) - len(skipped)}, skipped unchanged: {len(skipped)}")
+    for path in skipped:
+        print(f"Skipped {path}")
+    return report
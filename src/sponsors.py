@@ -0,0 +1,105 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# key marking the end of an alias in the alias trie
+END = ""
+
+
+def count_column(sponsor):
+    """
+    :param sponsor: canonical sponsor name
+    :return: name of per-article mention count column, e.g. UnitedAirlines_Count
+    """
+    return f'{sponsor.replace(" ","")}_Count'
+
+def trie_pattern(words):
+    """
+    Builds a regex alternation of words shaped as a character trie, so matching at a position
+    follows one branch per character instead of trying every word in turn. Longer words are
+    preferred over words that are their prefix.
+
+    :param words: list of lower case words
+    :return: regex pattern string without flags
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[END] = {}
+
+    def node_pattern(node):
+        branches = [re.escape(char) + node_pattern(child) for char, child in sorted(node.items()) if char != END]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # an alias ends here, so continuing to a longer alias is optional
+        return f"(?:{pattern})?" if END in node else pattern
+
+    return node_pattern(trie)
+
+
+class SponsorMatcher:
+    """
+    Matches every alias of every sponsor in a registry with one compiled pattern and maps each
+    match back to its canonical sponsor, so scanning a text column costs about the same for
+    three sponsors as for hundreds.
+    """
+
+    def __init__(self, registry, phrase_pattern=None):
+        """
+        :param registry: dictionary of canonical sponsor name to list of aliases, matched case-insensitively
+        :param phrase_pattern: optional pattern matched before aliases in scan_pattern, e.g. sponsor phrases
+        """
+        self.sponsors = list(registry)
+        self.columns = [count_column(sponsor) for sponsor in self.sponsors]
+
+        # the canonical name is always an alias, longest alias wins when aliases overlap
+        self.codes = {}
+        for code, (sponsor, aliases) in enumerate(registry.items()):
+            for alias in [sponsor] + list(aliases):
+                self.codes.setdefault(alias.lower(), code)
+
+        self.pattern = trie_pattern(self.codes)
+        self.regex = re.compile(self.pattern, flags=re.IGNORECASE)
+        name_pattern = f"(?P<name>{self.pattern})"
+        self.scan_pattern = re.compile(f"{phrase_pattern}|{name_pattern}" if phrase_pattern else name_pattern, flags=re.IGNORECASE)
+
+    def sponsor_codes(self, names):
+        """
+        :param names: Series of matched aliases
+        :return: numpy array of sponsor codes, positions in self.sponsors
+        """
+        return names.str.lower().map(self.codes).to_numpy(dtype="int64")
+
+    def find(self, texts):
+        """
+        Finds aliases inside texts that were matched by a longer pattern, e.g. sponsor phrases.
+
+        :param texts: Series of texts
+        :return: Series of matched aliases indexed like texts, one entry per match
+        """
+        return texts.str.findall(self.regex).explode().dropna()
+
+    def count_matrix(self, articles, names, n_articles):
+        """
+        Counts sponsor mentions per article with one bincount over (article, sponsor) pairs.
+
+        :param articles: numpy array of article position of each matched alias
+        :param names: Series of matched aliases
+        :param n_articles: number of articles
+        :return: numpy array of counts, one row per article and one column per sponsor
+        """
+        cells = np.asarray(articles, dtype="int64") * len(self.sponsors) + self.sponsor_codes(names)
+        return np.bincount(cells, minlength=n_articles * len(self.sponsors)).reshape(n_articles, len(self.sponsors))
+
+    def count_columns(self, articles, names, index):
+        """
+        :param articles: numpy array of article position of each matched alias
+        :param names: Series of matched aliases
+        :param index: index of articles DataFrame
+        :return: DataFrame with one _Count column per sponsor
+        """
+        return pd.DataFrame(self.count_matrix(articles, names, len(index)), columns=self.columns, index=index)
@@ -0,0 +1,233 @@
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from config import CLEANED_DATA_DIR, STORAGE_FORMAT, EXPORT_CSV
+
+DATE = "datetime64[ns]"
+# object columns without a schema entry are stored as Arrow-backed strings
+STRING = "string[pyarrow]"
+FILE_EXTENSIONS = {"feather": ".feather", "parquet": ".parquet"}
+
+# explicit column types of cleaned datasets, columns missing from a schema use the default type given to write_table
+STATS_SCHEMA = {
+    "Season": "int16",
+    "Date": DATE,
+    "Opponent": "category",
+    "Home_Away": "category",
+    "Win": "int8",
+    "Overtime": "int8",
+    "Wins": "int16",
+    "Losses": "int16",
+    "Team_Score": "int16",
+    "Opp_Score": "int16",
+    "Abs_Point_Difference": "int16",
+    "Hi_Points_Player": "category",
+    "Hi_Points_Value": "int16",
+    "Hi_Rebounds_Player": "category",
+    "Hi_Rebounds_Value": "int16",
+    "Hi_Assists_Player": "category",
+    "Hi_Assists_Value": "int16",
+}
+MENTIONS_SCHEMA = {"Date": DATE, "article_id": "uint64", "sponsor": "category", "is_major": "bool"}
+TRENDS_SCHEMA = {"Date": DATE, "isPartial": "boolean"}
+ALL_DATA_SCHEMA = {"Date": DATE, "Season": "Int16", "Hi_Points_Player": "category", "Hi_Rebounds_Player": "category", "Hi_Assists_Player": "category"}
+
+
+def table_path(name, data_dir=CLEANED_DATA_DIR, storage_format=STORAGE_FORMAT):
+    """
+    :param name: dataset file name or path, a .csv extension is replaced by the storage format's
+    :param data_dir: directory of dataset when name has no directory
+    :param storage_format: "feather" or "parquet"
+    :return: path of typed columnar file
+    """
+    if not os.path.dirname(name):
+        name = os.path.join(data_dir, name)
+    return os.path.splitext(name)[0] + FILE_EXTENSIONS[storage_format]
+
+def csv_path(name, data_dir=CLEANED_DATA_DIR):
+    """
+    :param name: dataset file name or path
+    :param data_dir: directory of dataset when name has no directory
+    :return: path of CSV export
+    """
+    if not os.path.dirname(name):
+        name = os.path.join(data_dir, name)
+    return os.path.splitext(name)[0] + ".csv"
+
+def apply_schema(df, schema=None, default=None):
+    """
+    Casts DataFrame columns to the types of a schema.
+
+    :param df: pandas DataFrame
+    :param schema: dictionary of column name to dtype
+    :param default: dtype of columns missing from schema, object columns become Arrow-backed strings if not given
+    :return: typed DataFrame
+    """
+    schema = schema or {}
+    dtypes = {}
+    for column in df.columns:
+        if column in schema:
+            dtypes[column] = schema[column]
+        elif default is not None:
+            dtypes[column] = default
+        elif df[column].dtype == object:
+            dtypes[column] = STRING
+
+    return df.astype(dtypes)
+
+def table_exists(name, **kwargs):
+    """
+    :param name: dataset file name or path
+    :param data_dir: directory of dataset when name has no directory
+    :param storage_format: "feather" or "parquet"
+    :return: True if dataset was written
+    """
+    return os.path.exists(table_path(name, kwargs.get("data_dir", CLEANED_DATA_DIR), kwargs.get("storage_format", STORAGE_FORMAT)))
+
+def write_table(df, name, schema=None, **kwargs):
+    """
+    Writes a dataset as a typed columnar file, and as CSV when exporting is enabled.
+
+    :param df: pandas DataFrame
+    :param name: dataset file name or path
+    :param schema: dictionary of column name to dtype
+    :param default: dtype of columns missing from schema
+    :param data_dir: directory of dataset when name has no directory
+    :param storage_format: "feather" (uncompressed Arrow IPC, memory-mappable) or "parquet"
+    :param export_csv: also write a CSV copy
+    :return: typed DataFrame that was written
+    """
+    data_dir = kwargs.get("data_dir", CLEANED_DATA_DIR)
+    storage_format = kwargs.get("storage_format", STORAGE_FORMAT)
+    path = table_path(name, data_dir, storage_format)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    df = apply_schema(df.reset_index(drop=True), schema, kwargs.get("default"))
+
+    # write to a temporary file first so readers never see a partial file
+    tmp_path = f"{path}.tmp"
+    if storage_format == "feather":
+        df.to_feather(tmp_path, compression="uncompressed")
+    else:
+        df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    if kwargs.get("export_csv", EXPORT_CSV):
+        df.to_csv(csv_path(name, data_dir), index=False)
+
+    return df
+
+def read_table(name, columns=None, **kwargs):
+    """
+    Reads a dataset written by write_table with its stored types. Only the requested columns
+    are read, and the file is memory-mapped instead of being read into memory first. Datasets
+    that only exist as CSV from before typed storage are read from the CSV.
+
+    :param name: dataset file name or path
+    :param columns: list of columns to read, all columns if not given
+    :param memory_map: memory-map the file
+    :param data_dir: directory of dataset when name has no directory
+    :param storage_format: "feather" or "parquet"
+    :return: pandas DataFrame
+    """
+    data_dir = kwargs.get("data_dir", CLEANED_DATA_DIR)
+    storage_format = kwargs.get("storage_format", STORAGE_FORMAT)
+    memory_map = kwargs.get("memory_map", True)
+    path = table_path(name, data_dir, storage_format)
+
+    if not os.path.exists(path) and os.path.exists(csv_path(name, data_dir)):
+        print(f"{path} not found, reading {csv_path(name, data_dir)}")
+        parse_dates = ["Date"] if columns is None or "Date" in columns else None
+        return pd.read_csv(csv_path(name, data_dir), usecols=columns, parse_dates=parse_dates)
+
+    if storage_format == "feather":
+        table = feather.read_table(path, columns=columns, memory_map=memory_map)
+    else:
+        table = pq.read_table(path, columns=columns, memory_map=memory_map)
+
+    return table.to_pandas()
+
+def dataset_path(name, data_dir=CLEANED_DATA_DIR):
+    """
+    :param name: partitioned dataset name or path, an extension is removed
+    :param data_dir: directory of dataset when name has no directory
+    :return: path of partitioned dataset directory
+    """
+    if not os.path.dirname(name):
+        name = os.path.join(data_dir, name)
+    return os.path.splitext(name)[0]
+
+def write_partitioned(df, name, partition_column, schema=None, **kwargs):
+    """
+    Writes a dataset as one directory with a Hive-style sub-directory per value of the partition
+    column, e.g. Season=2021/, so readers only open the partitions they ask for. Rows with a missing
+    partition value go to the __HIVE_DEFAULT_PARTITION__ sub-directory. The directory is replaced
+    as a whole, so partitions that no longer have rows do not linger.
+
+    :param df: pandas DataFrame
+    :param name: dataset name or path
+    :param partition_column: column to partition by, stored in the directory names only
+    :param schema: dictionary of column name to dtype
+    :param default: dtype of columns missing from schema
+    :param data_dir: directory of dataset when name has no directory
+    :param storage_format: "feather" or "parquet" file of each partition
+    :return: typed DataFrame that was written
+    """
+    path = dataset_path(name, kwargs.get("data_dir", CLEANED_DATA_DIR))
+    storage_format = kwargs.get("storage_format", STORAGE_FORMAT)
+    df = apply_schema(df.reset_index(drop=True), schema, kwargs.get("default"))
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    partitioning = ds.partitioning(pa.schema([table.schema.field(partition_column)]), flavor="hive")
+
+    # write next to the old directory and swap it in once complete
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    ds.write_dataset(table, tmp_path, format=storage_format, partitioning=partitioning,
+                     basename_template=f"part-{{i}}{FILE_EXTENSIONS[storage_format]}", preserve_order=True)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+
+    return df
+
+def read_partitioned(name, partitions=None, columns=None, **kwargs):
+    """
+    Reads a dataset written by write_partitioned. Only the directories of the requested partitions
+    and only the requested columns are read.
+
+    :param name: dataset name or path
+    :param partitions: dictionary of partition column to list of values to read, every partition if not given
+    :param columns: list of columns to read, all columns if not given
+    :param schema: dictionary of column name to dtype, e.g. to restore the type of partition columns
+    :param sort_by: column to sort rows by, partitions are read in directory order
+    :param data_dir: directory of dataset when name has no directory
+    :param storage_format: "feather" or "parquet"
+    :return: pandas DataFrame
+    """
+    path = dataset_path(name, kwargs.get("data_dir", CLEANED_DATA_DIR))
+    storage_format = kwargs.get("storage_format", STORAGE_FORMAT)
+    dataset = ds.dataset(path, format=storage_format, partitioning="hive")
+
+    # partitions not matching the filter are pruned by directory name without opening their files
+    partition_filter = None
+    for column, values in (partitions or {}).items():
+        condition = ds.field(column).isin(list(values))
+        partition_filter = condition if partition_filter is None else partition_filter & condition
+
+    df = dataset.to_table(columns=columns, filter=partition_filter).to_pandas()
+
+    # partition columns are read last, put columns back in the order they were written
+    written = [column["name"] for column in (dataset.schema.pandas_metadata or {}).get("columns", [])]
+    order = columns or [column for column in written if column in df.columns]
+    df = df[order + [column for column in df.columns if column not in order]]
+    df = apply_schema(df, {column: dtype for column, dtype in (kwargs.get("schema") or {}).items() if column in df.columns})
+    if kwargs.get("sort_by"):
+        df = df.sort_values(kwargs["sort_by"], ignore_index=True)
+    return df
@@ -1,9 +1,151 @@
 import os
+import tempfile
+import time
+import requests
 from load_datasets import get_gsw_articles_api, get_gsw_game_stats_webscrape, get_gsw_sponsor_trends
 from config import DATA_DIR, RAW_DATA_DIR, ARTICLES_URL, STATS_URL, STATS_HTML, ARTICLE_JSON, ARTICLE_CSV, STATS_CSV, TEAM
+from fetcher import Fetcher, CircuitOpenError
+from fixture_server import FixtureServer
+from http_cache import ResponseCache
+
+def check(name, passed):
+    """
+    Prints the outcome of a check.
+
+    :param name: what was checked
+    :param passed: whether the check passed
+    :return: passed
+    """
+    print(f"{'PASS' if passed else 'FAIL'}: {name}")
+    return passed
+
+def check_retries():
+    """
+    Requests pages from a fixture server failing a third of requests with 503 and Retry-After: 0,
+    so every page succeeds after retries and no backoff delay is waited.
+
+    :return: True if checks passed
+    """
+    with FixtureServer(error_rate=0.3, seed=1) as server, Fetcher("retries", backoff_base=5, retry_budget=100) as fetcher:
+        pages = [fetcher.get(server.articles_url.format(page)).json()["page"] for page in range(1, 21)]
+        return all([
+            check("every page is retrieved despite errors", pages == list(range(1, 21))),
+            check("every request is counted as an attempt", fetcher.stats["attempts"] == server.requests),
+            check("every attempt after the first of a page is a retry", fetcher.stats["attempts"] - fetcher.stats["retries"] == 20),
+            check("Retry-After replaces the backoff delay", fetcher.stats["wait_seconds"] == 0),
+            check("backoff without Retry-After doubles up to backoff_max",
+                  all(0 <= fetcher.backoff(retry) <= min(fetcher.backoff_max, 5 * 2 ** retry) for retry in range(10))),
+            check("no request failed", fetcher.stats["failures"] == 0),
+        ])
+
+def check_retry_budget():
+    """
+    Requests pages from a fixture server that always fails until the source's retry budget is used up.
+
+    :return: True if checks passed
+    """
+    with FixtureServer(error_rate=1.0) as server, Fetcher("budget", max_retries=5, retry_budget=3, failure_threshold=10) as fetcher:
+        failed = 0
+        for page in (1, 2):
+            try:
+                fetcher.get(server.articles_url.format(page))
+            except requests.HTTPError:
+                failed += 1
+        return all([
+            check("requests fail once retries run out", failed == 2),
+            check("retries stop at the retry budget", fetcher.stats["retries"] == 3),
+            check("no request is sent beyond the budget", server.requests == 2 + 3),
+        ])
+
+def check_circuit_breaker():
+    """
+    Requests pages from a fixture server that always fails until the circuit breaker opens.
+
+    :return: True if checks passed
+    """
+    with FixtureServer(error_rate=1.0) as server, Fetcher("circuit", max_retries=0, failure_threshold=3) as fetcher:
+        errors = []
+        for page in range(1, 6):
+            try:
+                fetcher.get(server.articles_url.format(page))
+            except (requests.HTTPError, CircuitOpenError) as e:
+                errors.append(type(e))
+        return all([
+            check("circuit opens after failure_threshold failures", fetcher.circuit_open),
+            check("requests after the circuit opens are skipped",
+                  errors == [requests.HTTPError] * 3 + [CircuitOpenError] * 2 and server.requests == 3),
+        ])
+
+def check_invalid_url():
+    """
+    Requests an invalid url, which is not retried and does not count against the source.
+
+    :return: True if checks passed
+    """
+    with Fetcher("invalid", failure_threshold=1) as fetcher:
+        try:
+            fetcher.get("not a url")
+            raised = False
+        except requests.RequestException:
+            raised = True
+        return all([
+            check("invalid url raises right away", raised and fetcher.stats["retries"] == 0),
+            check("invalid url does not open the circuit", not fetcher.circuit_open),
+        ])
+
+def check_not_modified():
+    """
+    Requests a page twice from a fixture server sending ETags, the second time answered with 304 from the cache.
+
+    :return: True if checks passed
+    """
+    with FixtureServer(etags=True) as server, tempfile.TemporaryDirectory() as cache_dir:
+        with Fetcher("not modified", cache=ResponseCache(cache_dir), ttl=0) as fetcher:
+            first = fetcher.get(server.articles_url.format(1))
+            second = fetcher.get(server.articles_url.format(1))
+            not_modified = fetcher.stats["not_modified"]
+        with Fetcher("fresh", cache=ResponseCache(cache_dir), ttl=None) as fetcher:
+            third = fetcher.get(server.articles_url.format(1))
+            cache_hits = fetcher.stats["cache_hits"]
+        return all([
+            check("stale response is revalidated with a 304", not_modified == 1 and server.requests == 2),
+            check("304 is served from the cache", getattr(second, "from_cache", False) and second.content == first.content),
+            check("fresh response is served without a request", third.from_cache and cache_hits == 1 and server.requests == 2),
+        ])
+
+def check_eviction():
+    """
+    Stores responses over a cache's size cap, after using the oldest one again.
+
+    :return: True if checks passed
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResponseCache(cache_dir, max_bytes=25)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"x" * 10
+        for url in ("first", "second"):
+            cache.store(url, response)
+            time.sleep(0.01)
+        cache.response("first", cache.lookup("first"))
+        time.sleep(0.01)
+        cache.store("third", response)
+        return all([
+            check("least recently used response is evicted at the size cap",
+                  [cache.lookup(url) is not None for url in ("first", "second", "third")] == [True, False, True]),
+            check("evicted body is removed", not os.path.exists(cache.body_path(cache.key("second")))),
+            check("recently used order is saved", ResponseCache(cache_dir).index == cache.index),
+        ])
+
 if __name__ == "__main__":
     print("Running tests for Final Project:\n")
 
+    # --- Fetcher and Response Cache ---
+    # run against a local fixture server, so they give the same result every time
+    results = [check_retries(), check_retry_budget(), check_circuit_breaker(), check_invalid_url(),
+               check_not_modified(), check_eviction()]
+    print(f"\n{sum(results)} of {len(results)} fetcher and cache checks passed\n")
+
     # Create a data directory
     os.makedirs(DATA_DIR, exist_ok=True)
 
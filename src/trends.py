@@ -0,0 +1,328 @@
+import json
+import os
+import re
+import threading
+import time
+from calendar import monthrange
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from pytrends.request import TrendReq
+
+from config import (TREND_START_DATE, TREND_END_DATE, TRENDS_CACHE_DIR, TRENDS_WORKERS,
+                    TRENDS_REQUESTS_PER_MINUTE, TRENDS_BURST, TRENDS_MAX_RETRIES)
+from pipeline import inherit_stage_output
+
+MANIFEST_FILE = "manifest.json"
+MONTHLY_WINDOW = "monthly"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: requests take one token each and tokens refill at a fixed rate,
+    so requests from every worker together never exceed the rate after an initial burst.
+    """
+
+    def __init__(self, rate_per_minute, capacity):
+        """
+        :param rate_per_minute: tokens added per minute
+        :param capacity: max tokens held, the largest burst allowed
+        """
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes one token, sleeping until one is available.
+
+        :return: seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+# rate limiter of every Google Trends request of this process made without a bucket of its own,
+# so keywords retrieved by separate calls still share one request rate
+SHARED_BUCKET = TokenBucket(TRENDS_REQUESTS_PER_MINUTE, TRENDS_BURST)
+
+
+def month_windows(start_date, end_date):
+    """
+    Splits a date range into calendar month windows.
+
+    :param start_date: first day of range
+    :param end_date: last day of range
+    :return: list of (first day, last day) date tuples
+    """
+    start_date, end_date = pd.to_datetime(start_date).date(), pd.to_datetime(end_date).date()
+    windows = []
+    current = start_date.replace(day=1)
+    while current <= end_date:
+        last_day = date(current.year, current.month, monthrange(current.year, current.month)[1])
+        windows.append((current, last_day))
+        current = last_day + timedelta(days=1)
+
+    return windows
+
+def window_name(window):
+    """
+    :param window: (first day, last day) date tuple
+    :return: name of window used for its cache file, e.g. 2021-01
+    """
+    return window[0].strftime("%Y-%m")
+
+def timeframe(window):
+    """
+    :param window: (first day, last day) date tuple
+    :return: Google Trends timeframe string for window
+    """
+    return f"{window[0]:%Y-%m-%d} {window[1]:%Y-%m-%d}"
+
+
+class TrendsWindowStore:
+    """
+    On-disk cache of raw Google Trends responses for one keyword, one CSV per month window
+    plus the monthly anchor series, with a manifest that checkpoints which windows are done.
+    Windows that contain partial data (the current month) are refetched on the next run.
+    """
+
+    def __init__(self, cache_dir, keyword):
+        """
+        :param cache_dir: directory holding the cache of every keyword
+        :param keyword: search keyword
+        """
+        self.keyword = keyword
+        self.keyword_dir = os.path.join(cache_dir, re.sub(r"[^\w-]", "", keyword.replace(" ", "_")))
+        self.manifest_path = os.path.join(self.keyword_dir, MANIFEST_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(self.keyword_dir, exist_ok=True)
+
+        try:
+            with open(self.manifest_path, encoding="utf-8") as file:
+                self.manifest = json.load(file)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def path(self, name):
+        return os.path.join(self.keyword_dir, f"{name}.csv")
+
+    def is_complete(self, name, timeframe_str):
+        """
+        Checks if a window was fetched for the same time frame without partial data.
+
+        :param name: window name
+        :param timeframe_str: time frame the window should cover
+        :return: True if window does not need to be fetched
+        """
+        entry = self.manifest.get(name)
+        return (entry is not None and not entry["partial"] and entry["timeframe"] == timeframe_str
+                and os.path.exists(self.path(name)))
+
+    def load(self, name):
+        """
+        :param name: window name
+        :return: cached raw interest over time DataFrame indexed by date
+        """
+        return pd.read_csv(self.path(name), index_col="date", parse_dates=["date"])
+
+    def save(self, name, timeframe_str, trend_df):
+        """
+        Saves a fetched window and checkpoints it in the manifest.
+
+        :param name: window name
+        :param timeframe_str: time frame the window covers
+        :param trend_df: raw interest over time DataFrame from pytrends
+        """
+        trend_df = trend_df.rename_axis("date")
+        if "isPartial" not in trend_df.columns:
+            trend_df = trend_df.assign(isPartial=False)
+        partial = bool(trend_df["isPartial"].astype(str).eq("True").any())
+
+        tmp_path = f"{self.path(name)}.tmp"
+        trend_df.to_csv(tmp_path)
+        os.replace(tmp_path, self.path(name))
+
+        with self._lock:
+            self.manifest[name] = {"timeframe": timeframe_str, "partial": partial, "fetched_at": time.time()}
+            tmp_path = f"{self.manifest_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self.manifest, file, indent=4)
+            os.replace(tmp_path, self.manifest_path)
+
+
+_local = threading.local()
+
+def fetch_window(keyword, timeframe_str, bucket, geo="US"):
+    """
+    Requests interest over time for one keyword and time frame, waiting on the shared
+    rate limiter before every attempt.
+
+    :param keyword: search keyword
+    :param timeframe_str: Google Trends timeframe string
+    :param bucket: TokenBucket shared by all workers
+    :param geo: geolocation
+    :return: raw interest over time DataFrame
+    """
+    # pytrends clients are not thread-safe, so each worker keeps its own
+    if not hasattr(_local, "pytrends"):
+        _local.pytrends = TrendReq(hl='en-US', tz=360)
+
+    for attempt in range(TRENDS_MAX_RETRIES + 1):
+        bucket.acquire()
+        try:
+            _local.pytrends.build_payload(kw_list=[keyword], cat=0, timeframe=timeframe_str, geo=geo, gprop='')
+            return _local.pytrends.interest_over_time()
+        except Exception as e:
+            if attempt == TRENDS_MAX_RETRIES:
+                raise
+            print(f"Error retrieving {keyword} trends for {timeframe_str}, retrying: {e}")
+            # a failed request is usually a 429, so wait out an extra token before retrying
+            bucket.acquire()
+
+def combine_windows(keyword, monthly_df, daily_dfs):
+    """
+    Scales daily windows by the monthly anchor series, producing the same columns as
+    pytrends' dailydata.get_daily_data.
+
+    :param keyword: search keyword
+    :param monthly_df: raw monthly interest over time for the full range
+    :param daily_dfs: list of raw daily interest over time DataFrames, one per month
+    :return: DataFrame of unscaled, monthly, isPartial, scale and scaled columns indexed by date
+    """
+    daily = pd.concat(daily_dfs).drop(columns=['isPartial'])
+    complete = daily.join(monthly_df, lsuffix='_unscaled', rsuffix='_monthly')
+
+    # Scale daily data by monthly weights so the data is comparable
+    complete[f'{keyword}_monthly'] = complete[f'{keyword}_monthly'].ffill()
+    complete['scale'] = complete[f'{keyword}_monthly'] / 100
+    complete[keyword] = complete[f'{keyword}_unscaled'] * complete.scale
+
+    return complete
+
+def load_cached_windows(keyword, **kwargs):
+    """
+    Rebuilds the daily data of a keyword from its cached month windows without any request.
+
+    :param keyword: search keyword
+    :param extract_dir: data directory holding the window cache
+    :param start_date: first day of range
+    :param end_date: last day of range
+    :return: DataFrame like combine_windows, or None if any window of the range is not cached
+    """
+    windows = month_windows(kwargs.get("start_date", TREND_START_DATE), kwargs.get("end_date", TREND_END_DATE))
+    full_window = (windows[0][0], windows[-1][1])
+    store_dir = os.path.join(kwargs.get("extract_dir", "."), TRENDS_CACHE_DIR)
+    store = TrendsWindowStore(store_dir, keyword)
+
+    if not all(store.is_complete(name, timeframe(window))
+               for name, window in [(MONTHLY_WINDOW, full_window)] + [(window_name(w), w) for w in windows]):
+        return None
+    return combine_windows(keyword, store.load(MONTHLY_WINDOW), [store.load(window_name(w)) for w in windows])
+
+def rescale_daily(unscaled, monthly, **kwargs):
+    """
+    Stitches daily Google Trends series of several keywords at once from their unscaled month windows
+    and monthly anchors, as numpy arrays of days by keywords. Each month window is on its own 0-100
+    scale, so a day is scaled by the anchor value of its month, as pytrends does. The result can then
+    be limited to a sub-range and normalized differently, without requesting anything again.
+
+    Keywords requested separately share no absolute scale, so an anchor normalization expresses each
+    keyword as a percentage of the anchor keyword on the same day rather than on a joint scale.
+
+    :param unscaled: DataFrame indexed by date with one column per keyword of raw daily window values
+    :param monthly: DataFrame like unscaled of the monthly anchor value of each day's month
+    :param start_date: first day of sub-range to return, the full range if not given
+    :param end_date: last day of sub-range to return
+    :param anchor: keyword column every keyword is divided by, in percent
+    :param normalize: "monthly" keeps the pytrends scale, "peak" rescales each keyword so its
+                      highest day in the sub-range is 100
+    :return: DataFrame of scaled values indexed by date with one column per keyword
+    """
+    index = unscaled.index
+    start_date = pd.to_datetime(kwargs.get("start_date") or index.min())
+    end_date = pd.to_datetime(kwargs.get("end_date") or index.max())
+    in_range = (index >= start_date) & (index <= end_date)
+
+    # monthly anchors are only given on the first day of a month by pytrends, later days use the same value
+    scaled = unscaled.to_numpy(dtype="float64")[in_range] * monthly.ffill().to_numpy(dtype="float64")[in_range] / 100
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        anchor = kwargs.get("anchor")
+        if anchor is not None:
+            anchor_values = scaled[:, unscaled.columns.get_loc(anchor)]
+            scaled = scaled / np.where(anchor_values > 0, anchor_values, np.nan)[:, None] * 100
+
+        normalize = kwargs.get("normalize", "monthly")
+        if normalize == "peak":
+            peaks = np.max(np.where(np.isnan(scaled), -np.inf, scaled), axis=0, initial=-np.inf)
+            scaled = scaled / np.where(peaks > 0, peaks, np.nan) * 100
+        elif normalize != "monthly":
+            raise ValueError(f"Unknown normalization {normalize}, use 'monthly' or 'peak'")
+
+    return pd.DataFrame(scaled, index=index[in_range], columns=unscaled.columns)
+
+def get_daily_trends(keywords, **kwargs):
+    """
+    Retrieves daily Google Trends data for several keywords by splitting the date range into
+    month windows. Every window is cached on disk as soon as it arrives, so an interrupted run
+    resumes where it stopped and a refresh only fetches windows that are missing or partial.
+    Windows of all keywords share one pool of workers and one token-bucket rate limiter.
+
+    :param keywords: list of search keywords
+    :param extract_dir: data directory holding the window cache
+    :param start_date: first day of range
+    :param end_date: last day of range
+    :param workers: number of windows requested at once
+    :param bucket: TokenBucket to share with other callers, SHARED_BUCKET if not given
+    :return: dictionary of keyword to DataFrame, None for keywords with missing windows
+    """
+    extract_dir = kwargs.get("extract_dir", ".")
+    windows = month_windows(kwargs.get("start_date", TREND_START_DATE), kwargs.get("end_date", TREND_END_DATE))
+    full_window = (windows[0][0], windows[-1][1])
+    bucket = kwargs.get("bucket") or SHARED_BUCKET
+    stores = {keyword: TrendsWindowStore(os.path.join(extract_dir, TRENDS_CACHE_DIR), keyword) for keyword in keywords}
+
+    # find windows still to fetch: the monthly anchor plus every daily month window
+    jobs = [(keyword, name, timeframe(window))
+            for keyword in keywords
+            for name, window in [(MONTHLY_WINDOW, full_window)] + [(window_name(w), w) for w in windows]
+            if not stores[keyword].is_complete(name, timeframe(window))]
+    print(f"fetching {len(jobs)} Google Trends windows for {len(keywords)} keywords")
+
+    failed = set()
+    with ThreadPoolExecutor(max_workers=kwargs.get("workers", TRENDS_WORKERS), initializer=inherit_stage_output()) as executor:
+        futures = {executor.submit(fetch_window, keyword, timeframe_str, bucket): (keyword, name, timeframe_str)
+                   for keyword, name, timeframe_str in jobs}
+        for future in as_completed(futures):
+            keyword, name, timeframe_str = futures[future]
+            try:
+                stores[keyword].save(name, timeframe_str, future.result())
+                print(f"{keyword}:{timeframe_str}")
+            # leave failed windows out of the checkpoint so the next run retries them
+            except Exception as e:
+                print(f"Error retrieving {keyword} trends for {timeframe_str}: {e}")
+                failed.add(keyword)
+
+    results = {}
+    for keyword in keywords:
+        if keyword in failed:
+            results[keyword] = None
+            continue
+        store = stores[keyword]
+        results[keyword] = combine_windows(keyword, store.load(MONTHLY_WINDOW), [store.load(window_name(w)) for w in windows])
+
+    return results